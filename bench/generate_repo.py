@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from header_core import Author, Header, render_header
+
+WORDS = ("engine render physics audio input entity component system memory allocator "
+         "shader texture mesh scene camera light asset loader parser network socket "
+         "thread job queue event window editor tool math vector matrix quaternion").split()
+
+EXTENSIONS = [".h", ".cpp", ".hpp", ".c", ".inl"]
+
+# Directories the walker should prune through the generated .gitignore
+IGNORED_DIRS = ["build", "out"]
+
+def random_words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def random_header(rng, filename):
+    """Builds a header with a random number of description lines, authors and contribution points."""
+    authors = []
+    author_count = rng.choice([1, 1, 2, 2, 3, 5])
+    for _ in range(author_count):
+        first = rng.choice(WORDS).capitalize()
+        last = rng.choice(WORDS).capitalize()
+        points = [random_words(rng, rng.randint(2, 8)) for _ in range(rng.randint(0, 4))]
+        authors.append(Author(str(100 // author_count), f"{first} {last}",
+                              f"{first.lower()}.{last[0].lower()}", points))
+    description = "\n".join(random_words(rng, rng.randint(4, 30)) for _ in range(rng.randint(0, 6)))
+    return Header(team=random_words(rng, 2).title(), website="https://team.web.app", filename=filename,
+                  description=description, authors=authors, year=rng.randint(2020, 2026))
+
+def random_body(rng):
+    """Builds a code body, mostly small with a few large generated ones."""
+    roll = rng.random()
+    if roll < 0.978:
+        lines = rng.randint(5, 150)
+    elif roll < 0.998:
+        lines = rng.randint(1000, 3000)
+    else:
+        lines = rng.randint(10000, 30000)
+    return "".join(f"int {rng.choice(WORDS)}_{i} = {i};  // {random_words(rng, 3)}\n" for i in range(lines))
+
+def generate_file(rng, path):
+    filename = os.path.basename(path)
+    newline = "\r\n" if rng.random() < 0.2 else "\n"
+    parts = []
+    if rng.random() < 0.05:
+        parts.append("\ufeff")  # Byte order mark
+    if rng.random() < 0.9:
+        parts.append(render_header(random_header(rng, filename)) + "\n\n")
+    parts.append(random_body(rng))
+    with open(path, "w", encoding="utf-8", newline=newline) as file:
+        file.write("".join(parts))
+
+def generate_repo(directory, file_count, seed=0, files_per_dir=40, ignored_fraction=0.2):
+    """Generates a synthetic C++ tree of file_count source files (plus ignored build artifacts) under directory."""
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".gitignore"), "w") as file:
+        file.write("".join(f"{name}/\n" for name in IGNORED_DIRS))
+
+    def make_path(root, index):
+        # Spread files over a few levels of nested directories
+        dir_index = index // files_per_dir
+        parts = [f"module{dir_index % 50}", f"sub{dir_index // 50 % 20}", f"part{dir_index // 1000}"]
+        folder = os.path.join(root, *parts[:1 + dir_index % 3])
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{rng.choice(WORDS)}_{index}{rng.choice(EXTENSIONS)}")
+
+    for i in range(file_count):
+        generate_file(rng, make_path(directory, i))
+
+    # Build artifacts that a good walker never reads
+    for i in range(int(file_count * ignored_fraction)):
+        root = os.path.join(directory, rng.choice(IGNORED_DIRS))
+        path = make_path(root, i)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(random_body(rng))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generates a synthetic C++ source tree for benchmarking.")
+    parser.add_argument("directory", help="where to generate the tree")
+    parser.add_argument("-n", "--files", type=int, default=1000, help="number of source files (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed, the same seed gives the same tree")
+    args = parser.parse_args(argv)
+    generate_repo(args.directory, args.files, args.seed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import cli
+from generate_repo import generate_repo
+from header_core import parse_header, read_header, render_header, write_header
+from walker import get_cpp_files
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# A benchmark is slower than its baseline if its time per operation grew by more than this fraction
+DEFAULT_TOLERANCE = 0.25
+
+def bench_walk(state):
+    state["paths"] = [full_path for full_path, _ in get_cpp_files(state["tree"])]
+    return len(state["paths"])
+
+def bench_detect(state):
+    state["locations"] = [read_header(path) for path in state["paths"]]
+    return len(state["paths"])
+
+def bench_parse(state):
+    state["headers"] = [parse_header(location.text) for location in state["locations"]]
+    return len(state["headers"])
+
+def bench_render(state):
+    for path, header in zip(state["paths"], state["headers"]):
+        render_header(header, filename=os.path.basename(path))
+    return len(state["headers"])
+
+def bench_save(state):
+    # Writing back the header a file already has leaves the tree unchanged, so runs can repeat
+    count = 0
+    for path, location in zip(state["paths"], state["locations"]):
+        if location.text:
+            write_header(path, location.text)
+            count += 1
+    return count
+
+def bench_batch_check(state):
+    return len(cli.run(state["tree"], fix=False))
+
+# Run in order, later benchmarks use what earlier ones left in the state
+BENCHMARKS = [
+    ("walk", bench_walk),
+    ("detect", bench_detect),
+    ("parse", bench_parse),
+    ("render", bench_render),
+    ("save", bench_save),
+    ("batch_check", bench_batch_check),
+]
+
+def run_benchmarks(tree, repeat=3, only=None):
+    """Runs every benchmark repeat times on tree and returns the best time of each."""
+    state = {"tree": tree}
+    results = {}
+    for name, function in BENCHMARKS:
+        best = None
+        ops = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ops = function(state)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if only and name not in only:
+            continue
+        results[name] = {
+            "seconds": best,
+            "ops": ops,
+            "us_per_op": best / ops * 1e6 if ops else 0.0,
+            "ops_per_second": ops / best if best > 0 else 0.0,
+        }
+    return results
+
+def compare(results, baseline, tolerance):
+    """Returns (name, baseline us/op, current us/op) for every benchmark slower than its baseline."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base and base["us_per_op"] > 0 and result["us_per_op"] > base["us_per_op"] * (1 + tolerance):
+            regressions.append((name, base["us_per_op"], result["us_per_op"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Times the headless paths of HeaderCommenter on a synthetic C++ tree.")
+    parser.add_argument("-n", "--files", type=int, default=1000, help="size of the generated tree (default: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed of the generated tree")
+    parser.add_argument("--tree", help="benchmark this existing tree instead of generating one (it is modified in place)")
+    parser.add_argument("--keep", action="store_true", help="keep the generated tree")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best one counts (default: 3)")
+    parser.add_argument("--only", action="append", choices=[name for name, _ in BENCHMARKS],
+                        help="only report these benchmarks (repeatable)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against (default: baselines/files-N.json if it exists)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown against the baseline as a fraction (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    tree = args.tree
+    generated = tree is None
+    if generated:
+        tree = tempfile.mkdtemp(prefix="headercommenter-bench-")
+        start = time.perf_counter()
+        generate_repo(tree, args.files, args.seed)
+        print(f"generated {args.files} files in {time.perf_counter() - start:.1f}s: {tree}", file=sys.stderr)
+
+    try:
+        results = run_benchmarks(tree, args.repeat, args.only)
+    finally:
+        if generated and not args.keep:
+            shutil.rmtree(tree, ignore_errors=True)
+
+    report = {
+        "files": args.files if generated else None,
+        "seed": args.seed if generated else None,
+        "tree": None if generated else tree,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"files-{args.files}.json")
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w") as file:
+            file.write(text + "\n")
+        print(f"baseline written to {baseline_path}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(baseline_path):
+        return 0
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline, args.tolerance)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:.1f} -> {after:.1f} us/op ({after / before - 1:+.0%})", file=sys.stderr)
+    if not regressions:
+        print(f"no regressions against {baseline_path}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
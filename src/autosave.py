@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from header_core import write_header
+
+# Edits closer together than this are merged into a single write
+AUTOSAVE_DELAY_SECONDS = 0.5
+
+class AutosaveWriter:
+    """Writes headers to disk on a background thread.
+
+    Submitting a header only records it as the latest wanted state of the
+    file. The thread waits until no new header was submitted for
+    AUTOSAVE_DELAY_SECONDS, then writes the latest one of each file, skipping
+    files whose header is already the one on disk. Errors are queued in
+    errors as (filepath, exception) for the UI to report."""
+    def __init__(self, write=write_header, delay=AUTOSAVE_DELAY_SECONDS):
+        self.write = write
+        self.delay = delay
+        self.pending = {}  # filepath -> header text waiting to be written
+        self.saved = {}    # filepath -> header text known to be on disk
+        self.last_submit = 0.0
+        self.condition = threading.Condition()
+        self.errors = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, filepath, header):
+        """Asks for header to be written to filepath once edits settle down."""
+        with self.condition:
+            if self.saved.get(filepath) == header:
+                self.pending.pop(filepath, None)
+                return
+            self.pending[filepath] = header
+            self.last_submit = time.monotonic()
+            self.condition.notify()
+
+    def mark_saved(self, filepath, header):
+        """Records that filepath holds header on disk, e.g. after opening or an explicit save."""
+        with self.condition:
+            self.saved[filepath] = header
+            if self.pending.get(filepath) == header:
+                del self.pending[filepath]
+
+    def is_saved(self, filepath, header):
+        """Checks whether header is what filepath holds on disk as far as the writer knows."""
+        with self.condition:
+            return self.saved.get(filepath) == header
+
+    def flush(self):
+        """Writes everything pending right away on the calling thread."""
+        with self.condition:
+            pending = self.pending
+            self.pending = {}
+        self.write_all(pending)
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+
+                # Wait for a pause in the edits
+                while True:
+                    remaining = self.last_submit + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+
+                pending = self.pending
+                self.pending = {}
+            self.write_all(pending)
+
+    def write_all(self, pending):
+        for filepath, header in pending.items():
+            with self.condition:
+                if self.saved.get(filepath) == header:
+                    continue
+            try:
+                self.write(filepath, header)
+            except Exception as e:
+                self.errors.put((filepath, e))
+                continue
+            with self.condition:
+                self.saved[filepath] = header
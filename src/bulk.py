@@ -0,0 +1,128 @@
+import difflib
+import os
+import queue
+import threading
+from header_core import Author, Header, read_header, write_header
+from header_template import get_format
+from pool import iter_chunk_results
+
+# Files handed to a worker process at a time, also the granularity of progress and cancellation
+BULK_CHUNK_SIZE = 64
+
+# Result status of a single file
+STATUS_CHANGED = "changed"
+STATUS_UNCHANGED = "unchanged"
+STATUS_MISSING = "missing"
+STATUS_ERROR = "error"
+
+class BulkEdit:
+    """A change applied to the header of many files at once. Fields left as None are kept as they are.
+
+    add_author is an Author appended to every header that does not list an
+    author with the same name yet."""
+    def __init__(self, team=None, website=None, year=None, add_author=None):
+        self.team = team
+        self.website = website
+        self.year = year
+        self.add_author = add_author
+
+    def is_empty(self):
+        return self.team is None and self.website is None and self.year is None and self.add_author is None
+
+    def apply(self, header):
+        """Returns a copy of header with the edit applied."""
+        header = Header.from_dict(header.to_dict())
+        if self.team is not None:
+            header.team = self.team
+        if self.website is not None:
+            header.website = self.website
+        if self.year is not None:
+            header.year = self.year
+        if self.add_author is not None and all(author.name != self.add_author.name for author in header.authors):
+            header.authors.append(Author.from_dict(self.add_author.to_dict()))
+        return header
+
+def header_diff(filepath, old, new):
+    """Returns a unified diff between two headers of a file."""
+    return "\n".join(difflib.unified_diff(old.split("\n"), new.split("\n"),
+                                          fromfile=filepath, tofile=filepath, lineterm=""))
+
+def edit_file(filepath, edit, write=False, template=None, journal=None):
+    """Applies an edit to the header of a file and returns (filepath, status, diff or error message).
+
+    Nothing is written unless write is set, so the diff doubles as a dry run.
+    Headers with lines the parser could not read are reported as errors and
+    never written, rendering them would drop those lines.
+    template is the text of the header template, None for the built-in format.
+    Writes are recorded in journal, a JournalBatch, if one is given."""
+    try:
+        header_format = get_format(template)
+        location = read_header(filepath, end_marker=header_format.end_marker)
+        if not location.text:
+            return filepath, STATUS_MISSING, "no header found"
+
+        header = header_format.parse(location.text)
+        if header.errors:
+            details = "; ".join(str(error) for error in header.errors)
+            return filepath, STATUS_ERROR, f"unparsed lines, fix them by hand first: {details}"
+
+        new = header_format.render(edit.apply(header), filename=os.path.basename(filepath))
+        if new == location.text:
+            return filepath, STATUS_UNCHANGED, ""
+
+        if write:
+            old = write_header(filepath, new, end_marker=header_format.end_marker)
+            if journal is not None:
+                journal.record(filepath, old, new, header_format.end_marker)
+        return filepath, STATUS_CHANGED, header_diff(filepath, location.text, new)
+    except Exception as e:
+        return filepath, STATUS_ERROR, str(e)
+
+def edit_files(paths, edit, write=False, template=None, journal=None):
+    """Worker process entry point: applies an edit to a chunk of files."""
+    return [edit_file(path, edit, write, template, journal) for path in paths]
+
+def iter_bulk_results(paths, edit, write=False, jobs=None, cancelled=None, template=None, journal=None):
+    """Applies an edit to many files in a process pool, yielding each file's result as its chunk completes.
+
+    Setting the cancelled event stops handing out chunks; files already
+    being processed still finish and are reported."""
+    args = (edit, write, template, journal)
+    for results in iter_chunk_results(edit_files, paths, args, BULK_CHUNK_SIZE, jobs, cancelled):
+        yield from results
+
+class BulkJob:
+    """Runs iter_bulk_results on a worker thread and queues its results for the UI.
+
+    The queue receives lists of results, then None once the job is done."""
+    def __init__(self, paths, edit, write=False, jobs=None, template=None, journal=None):
+        self.paths = paths
+        self.edit = edit
+        self.write = write
+        self.jobs = jobs
+        self.template = template
+        self.journal = journal
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        batch = []
+        try:
+            for result in iter_bulk_results(self.paths, self.edit, self.write, self.jobs, self.cancelled,
+                                            self.template, self.journal):
+                batch.append(result)
+                if len(batch) >= BULK_CHUNK_SIZE:
+                    self.queue.put(batch)
+                    batch = []
+            self.queue.put(batch)
+        except Exception as e:
+            self.queue.put([("", STATUS_ERROR, str(e))])
+        finally:
+            self.queue.put(None)
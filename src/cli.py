@@ -0,0 +1,219 @@
+import argparse
+import functools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import bulk
+import report
+from header_core import Author, locate_header, write_header
+from git_changes import GitError, changed_files
+from header_template import TemplateError, get_format, read_template
+from session import user_config_dir
+from undo_journal import JOURNAL_FILE, UndoJournal
+from walker import get_cpp_files, iter_cpp_files
+
+# Result status of a single file
+STATUS_OK = "ok"
+STATUS_FIXED = "fixed"
+STATUS_MISMATCH = "mismatch"
+STATUS_MISSING = "missing"
+STATUS_ERROR = "error"
+
+# Starting worker processes costs more than checking a handful of files
+MIN_PARALLEL_FILES = 64
+
+def process_file(filepath, fix=False, template=None, journal=None):
+    """Verifies (or rewrites, if fix is set) the header of a single file and returns (filepath, status, message).
+
+    template is the text of the header template to check against, None for the built-in format.
+    Only headers that parse cleanly are rewritten, the others stay mismatches
+    since rendering them would drop the lines the parser could not read.
+    Rewrites are recorded in journal, a JournalBatch, if one is given."""
+    try:
+        header_format = get_format(template)
+        with open(filepath, "rb") as file:
+            location = locate_header(file, end_marker=header_format.end_marker)
+            if not location.text:
+                return filepath, STATUS_MISSING, "no header found"
+
+            # Re-render the header with the real file name, keeping its copyright year
+            header = header_format.parse(location.text)
+            expected = header_format.render(header, filename=os.path.basename(filepath))
+            if expected == location.text:
+                return filepath, STATUS_OK, ""
+
+        if header.errors:
+            return filepath, STATUS_MISMATCH, f"header does not match the format, {header.errors[0]}"
+        if not fix:
+            return filepath, STATUS_MISMATCH, "header does not match the format"
+
+        old = write_header(filepath, expected, end_marker=header_format.end_marker)
+        if journal is not None:
+            journal.record(filepath, old, expected, header_format.end_marker)
+        return filepath, STATUS_FIXED, ""
+    except Exception as e:
+        return filepath, STATUS_ERROR, str(e)
+
+def run(directory, fix=False, jobs=None, template=None, journal=None):
+    """Processes every C++ file under directory and returns the list of results."""
+    return run_paths([full_path for full_path, _ in get_cpp_files(directory)], fix, jobs, template, journal)
+
+def run_paths(paths, fix=False, jobs=None, template=None, journal=None):
+    """Processes a list of files and returns the list of results."""
+    # Workers get the template text and compile it once per process
+    worker = functools.partial(process_file, fix=fix, template=template, journal=journal)
+    jobs = jobs or os.cpu_count() or 1
+
+    if jobs == 1 or len(paths) < MIN_PARALLEL_FILES:
+        return [worker(path) for path in paths]
+
+    # Large chunks keep the inter-process overhead small compared to the work per file
+    chunksize = max(1, min(256, len(paths) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(worker, paths, chunksize=chunksize))
+
+def open_journal(args):
+    """Returns the UndoJournal recording the headers this run rewrites, None with --no-journal."""
+    return None if args.no_journal else UndoJournal(os.path.join(user_config_dir(), JOURNAL_FILE))
+
+def print_summary(count, counts, elapsed):
+    """Prints the number of files processed, the throughput and the count of each status."""
+    rate = count / elapsed if elapsed > 0 else 0.0
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"{count} files in {elapsed:.2f}s ({rate:.0f} files/s){': ' + summary if summary else ''}",
+          file=sys.stderr)
+
+def run_edit(args, template=None, paths=None):
+    """Runs the edit command: applies the field changes of args to every header, or only prints the diff with --dry-run.
+
+    paths limits the edit to these files instead of the whole tree."""
+    add_author = None
+    if args.add_author:
+        percent, name, email = args.add_author
+        add_author = Author(percent, name, email, args.point or [])
+    edit = bulk.BulkEdit(team=args.team, website=args.website, year=args.year, add_author=add_author)
+    if edit.is_empty():
+        print("nothing to change, pass --team, --website, --year or --add-author", file=sys.stderr)
+        return 2
+
+    if paths is None:
+        paths = [full_path for full_path, _ in get_cpp_files(args.directory)]
+    journal = None if args.dry_run else open_journal(args)
+    batch = journal.start_batch("Bulk edit") if journal else None
+    start = time.perf_counter()
+    counts = {}
+    results = bulk.iter_bulk_results(paths, edit, write=not args.dry_run, jobs=args.jobs, template=template,
+                                     journal=batch)
+    for filepath, status, detail in results:
+        counts[status] = counts.get(status, 0) + 1
+        if args.quiet:
+            continue
+        if status == bulk.STATUS_CHANGED:
+            print(detail if args.dry_run else f"{status}: {filepath}")
+        elif status != bulk.STATUS_UNCHANGED:
+            print(f"{status}: {filepath} ({detail})")
+    if journal:
+        journal.finish_batch(batch)
+    print_summary(len(paths), counts, time.perf_counter() - start)
+    return 1 if counts.get(bulk.STATUS_ERROR, 0) else 0
+
+def run_report(args, template=None, paths=None):
+    """Runs the report command: per-author totals over every header, as CSV or JSON.
+
+    paths limits the report to these files instead of the whole tree."""
+    if paths is None:
+        paths = (full_path for full_path, _ in iter_cpp_files(args.directory))
+    start = time.perf_counter()
+    result = report.build_report(paths, jobs=args.jobs, template=template)
+    text = result.to_json() + "\n" if args.format == "json" else result.to_csv()
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as file:
+            file.write(text)
+    else:
+        sys.stdout.write(text)
+    counts = {"authors": len(result.authors)}
+    if result.missing:
+        counts[STATUS_MISSING] = result.missing
+    if result.errors:
+        counts[STATUS_ERROR] = result.errors
+    print_summary(result.files + result.errors, counts, time.perf_counter() - start)
+    return 1 if result.errors else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="headercommenter",
+                                     description="Verifies, rewrites, edits or reports on the header comments of every C++ file in a directory tree.")
+    parser.add_argument("command", choices=["check", "fix", "edit", "report"],
+                        help="check reports bad headers, fix rewrites them, edit changes fields in every header, "
+                             "report totals the contributions of each author")
+    parser.add_argument("directory", help="root of the source tree")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (default: all cores)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="only print the summary")
+    parser.add_argument("--template", help="header template file (default: .headercommenter-template in the directory, "
+                                           "else the built-in format)")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="do not record rewritten headers in the undo journal of the editor's History window")
+    edit_group = parser.add_argument_group("edit options")
+    edit_group.add_argument("--team", help="set the team name")
+    edit_group.add_argument("--website", help="set the website")
+    edit_group.add_argument("--year", type=int, help="set the copyright year")
+    edit_group.add_argument("--add-author", nargs=3, metavar=("PERCENT", "NAME", "EMAIL"),
+                            help="add an author to headers that do not list them yet")
+    edit_group.add_argument("--point", action="append", help="contribution point of the added author (repeatable)")
+    edit_group.add_argument("--dry-run", action="store_true", help="print the header diffs without writing anything")
+    git_group = parser.add_argument_group("git options (every command)").add_mutually_exclusive_group()
+    git_group.add_argument("--changed", action="store_true",
+                           help="only files that git reports as staged, modified or untracked")
+    git_group.add_argument("--staged", action="store_true",
+                           help="only files staged for the next commit (their work tree version is checked)")
+    git_group.add_argument("--since", metavar="REF", help="only files that differ between REF and the work tree")
+    report_group = parser.add_argument_group("report options")
+    report_group.add_argument("--format", choices=["csv", "json"], default="csv", help="report format (default: csv)")
+    report_group.add_argument("-o", "--output", help="write the report to this file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+
+    try:
+        template = read_template(args.directory, args.template)
+        get_format(template)
+    except (OSError, UnicodeDecodeError, TemplateError) as e:
+        parser.error(f"bad template: {e}")
+
+    start = time.perf_counter()
+    paths = None
+    if args.changed or args.staged or args.since:
+        try:
+            paths = changed_files(args.directory, staged_only=args.staged, since=args.since)
+        except GitError as e:
+            parser.error(str(e))
+
+    if args.command == "edit":
+        return run_edit(args, template, paths)
+    if args.command == "report":
+        return run_report(args, template, paths)
+
+    fix = args.command == "fix"
+    journal = open_journal(args) if fix else None
+    batch = journal.start_batch("Fix") if journal else None
+    if paths is not None:
+        results = run_paths(paths, fix=fix, jobs=args.jobs, template=template, journal=batch)
+    else:
+        results = run(args.directory, fix=fix, jobs=args.jobs, template=template, journal=batch)
+    if journal:
+        journal.finish_batch(batch)
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for filepath, status, message in results:
+        counts[status] = counts.get(status, 0) + 1
+        if status != STATUS_OK and not args.quiet:
+            print(f"{status}: {filepath}" + (f" ({message})" if message else ""))
+    print_summary(len(results), counts, elapsed)
+
+    failed = counts.get(STATUS_MISMATCH, 0) + counts.get(STATUS_MISSING, 0) + counts.get(STATUS_ERROR, 0)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import collections
+
+# Documents kept ready for switching, files with unsaved edits are kept on top of these
+DOCUMENT_CACHE_SIZE = 16
+
+class Document:
+    """Everything shown for an open file, kept so that switching back to it needs no reading or parsing.
+
+    stat is the (mtime, size) of the file when it was read. header is the
+    Header parsed from it and location where that header sits. edited is
+    the Header as last edited in the form (None until switched away from)
+    and rendered its header text. saved_header is the Header the form held
+    when the file was loaded or last saved, edits are told apart from it
+    rather than from the text on disk. code holds the code loaded so far and
+    window the FileWindow to load more of it from."""
+    __slots__ = ("filepath", "stat", "location", "header", "edited", "rendered", "saved_header", "code", "window", "code_view")
+
+    def __init__(self, filepath, stat, location, header):
+        self.filepath = filepath
+        self.stat = stat
+        self.location = location
+        self.header = header
+        self.edited = None
+        self.rendered = location.text
+        self.saved_header = None
+        self.code = None
+        self.window = None
+        self.code_view = 0.0  # Scroll position of the code area
+
+class DocumentCache:
+    """Least recently used cache of Documents keyed by path.
+
+    is_dirty(document) tells whether a document has unsaved edits; those
+    are never evicted, so the cache can grow past its capacity while many
+    files have unsaved edits."""
+    def __init__(self, is_dirty, capacity=DOCUMENT_CACHE_SIZE):
+        self.is_dirty = is_dirty
+        self.capacity = capacity
+        self.documents = collections.OrderedDict()  # filepath -> Document, least recently used first
+
+    def __contains__(self, filepath):
+        return filepath in self.documents
+
+    def __iter__(self):
+        return iter(self.documents.values())
+
+    def get(self, filepath, stat=None):
+        """Returns the document of a file and marks it as the most recently used one.
+
+        With stat, a document read when the file was different is dropped,
+        unless it has unsaved edits, and None is returned."""
+        document = self.documents.get(filepath)
+        if document is None:
+            return None
+        if stat is not None and document.stat != stat and not self.is_dirty(document):
+            del self.documents[filepath]
+            return None
+        self.documents.move_to_end(filepath)
+        return document
+
+    def peek(self, filepath):
+        """Returns the document of a file without counting it as used."""
+        return self.documents.get(filepath)
+
+    def put(self, document):
+        """Adds a document as the most recently used one, returning the documents evicted to make room."""
+        self.documents[document.filepath] = document
+        self.documents.move_to_end(document.filepath)
+        evicted = []
+        excess = len(self.documents) - self.capacity
+        if excess > 0:
+            for filepath, candidate in list(self.documents.items())[:-1]:
+                if excess == 0:
+                    break
+                if not self.is_dirty(candidate):
+                    del self.documents[filepath]
+                    evicted.append(candidate)
+                    excess -= 1
+        return evicted
+
+    def remove(self, filepath):
+        return self.documents.pop(filepath, None)
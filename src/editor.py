@@ -1,81 +1,519 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, Menu
+import multiprocessing
 import os
-from datetime import datetime
-
-# Allowed C++ file extensions
-CPP_EXTENSIONS = {".h", ".hpp", ".c", ".cpp", ".inl"}
+import queue
+import threading
+import time
+from header_core import Author, Header, write_header
+from autosave import AutosaveWriter
+from document_cache import Document, DocumentCache
+from file_window import FileWindow
+from header_cache import CACHE_FILE, HeaderCache
+from header_index import HeaderIndex, IndexBuild
+from header_template import DEFAULT_FORMAT, TemplateError, get_format, read_template
+from session import load_snapshot, read_last_directory, save_snapshot, user_config_dir, write_last_directory
+from tracing import traced, tracer
+from tree_index import TreeIndex, parent_path
+from undo_journal import JOURNAL_FILE, STATUS_REVERTED, RollbackJob, UndoJournal
+from walker import iter_cpp_files
 
 def save_last_opened_directory(directory):
-    """Saves the last opened directory to the config file."""
-    config_file = "headercommenter-config.txt"
-    with open(config_file, "w") as file:
-        file.write(directory)
+    """Saves the last opened directory to the per-user config."""
+    try:
+        write_last_directory(directory)
+    except OSError:
+        pass  # Only a convenience for the next launch
 
 def open_last_opened_directory():
-    """Opens the last opened directory from the config file."""
-    config_file = "headercommenter-config.txt"
-    if os.path.exists(config_file):
-        with open(config_file, "r") as file:
-            directory = file.read()
-            open_directory(directory)
-
-def get_cpp_files(directory):
-    """Recursively finds all C++ files and returns them as a list of (fullpath, relative path)."""
-    cpp_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if os.path.splitext(file)[1].lower() in CPP_EXTENSIONS:
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, directory)
-                cpp_files.append((full_path, relative_path))
-    return cpp_files
+    """Opens the last opened directory from the per-user config."""
+    directory = read_last_directory()
+    if directory and os.path.isdir(directory):
+        open_directory(directory)
+
+def save_session_snapshot():
+    """Stores the tree of the open directory with the expanded directories, selection and open file."""
+    index = getattr(root, 'tree_index', None)
+    if index is None or getattr(root, 'directory_scan', None) is not None:
+        return  # Nothing open, or a scan that has not seen the whole tree yet
+    open_dirs = [rel_dir for rel_dir in root.shown_dirs
+                 if rel_dir and file_tree.exists(dir_item(rel_dir)) and file_tree.item(dir_item(rel_dir), "open")]
+    state = {"open_dirs": open_dirs, "selection": list(file_tree.selection()),
+             "tabs": list(root.tab_frames), "current_file": getattr(root, 'current_file', None)}
+    try:
+        save_snapshot(index, state)
+    except OSError:
+        pass  # The next launch scans the directory instead
+
+def restore_view_state(state):
+    """Expands, selects and opens what was expanded, selected and open when a snapshot was stored."""
+    # Parents are shorter than their children, so they are expanded first
+    for rel_dir in sorted(state.get("open_dirs", []), key=len):
+        if file_tree.exists(dir_item(rel_dir)):
+            show_dir_children(rel_dir)
+            file_tree.item(dir_item(rel_dir), open=True)
+    selection = [item for item in state.get("selection", []) if file_tree.exists(item)]
+    if selection:
+        file_tree.selection_set(selection)
+        file_tree.see(selection[0])
+    for filepath in state.get("tabs", []) + [state.get("current_file")]:
+        if filepath and os.path.isfile(filepath):
+            open_file(filepath)
+
+def quit_app(event=None):
+    """Stores the session snapshot and leaves the main loop."""
+    save_session_snapshot()
+    root.quit()
+
+# Files found by a directory scan are handed to the UI at least this often
+SCAN_BATCH_SIZE = 500
+SCAN_BATCH_SECONDS = 0.05
+SCAN_POLL_MS = 30
+SCAN_POLL_BUDGET_SECONDS = 0.02
+
+# The tree filter waits for a pause in typing, and expands every directory when there are only a few matches
+FILTER_DELAY_MS = 150
+FILTER_EXPAND_LIMIT = 200
+
+class DirectoryScan:
+    """Walks a directory on a worker thread and hands the files found to the Tk main thread in batches."""
+    def __init__(self, directory, revalidate=False):
+        self.directory = directory
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.file_count = 0
+        # When checking a tree restored from a snapshot, the files found are remembered to tell which are gone
+        self.seen = set() if revalidate else None
+        self.thread = threading.Thread(target=self.run, daemon=True)
 
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        """Worker thread: walks the directory and queues batches of files, then None when done."""
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            with tracer.span("get_cpp_files"):
+                for entry in iter_cpp_files(self.directory):
+                    if self.cancelled.is_set():
+                        return
+                    batch.append(entry)
+                    if len(batch) >= SCAN_BATCH_SIZE or time.monotonic() - last_flush >= SCAN_BATCH_SECONDS:
+                        self.queue.put(batch)
+                        batch = []
+                        last_flush = time.monotonic()
+            self.queue.put(batch)
+        except Exception as e:
+            self.queue.put(e)
+        finally:
+            self.queue.put(None)
+
+@traced("open_directory")
 def open_directory(directory):
-    """Opens a directory and lists all C++ files in a tree view."""
+    """Opens a directory and lists all C++ files in a tree view, scanning it in the background.
+
+    A directory opened before is shown right away from its snapshot, the
+    scan then only adds and removes what changed since."""
+    if not directory:
+        return
+    index = getattr(root, 'tree_index', None)
+    if index is not None and index.directory != directory and not close_all_tabs():
+        return  # Files of another directory were kept open with unsaved edits
+    cancel_directory_scan()
+    cancel_index_build()
+    stop_watcher()
     file_tree.delete(*file_tree.get_children())  # Clear previous entries
-    cpp_files = get_cpp_files(directory)
+    load_header_format(directory)
+    snapshot = load_snapshot(directory)
+    root.tree_index = snapshot[0] if snapshot is not None else TreeIndex(directory)
+    root.view_index = root.tree_index
+    root.shown_dirs = {""}
+    root.header_index = HeaderIndex()
+    clear_filter()
+    if snapshot is not None:
+        show_dir_children("")
+        restore_view_state(snapshot[1])
 
-    if not cpp_files:
+    scan = DirectoryScan(directory, revalidate=snapshot is not None)
+    root.directory_scan = scan
+    scan_label.config(text="Checking..." if scan.seen is not None else "Scanning...")
+    scan_frame.pack(side="bottom", fill="x")
+    scan.start()
+    root.after(SCAN_POLL_MS, poll_directory_scan, scan)
+
+def load_header_format(directory):
+    """Uses the header template of a directory if it has one, else the built-in format."""
+    root.header_template = None
+    root.header_format = DEFAULT_FORMAT
+    try:
+        template = read_template(directory)
+        root.header_format = get_format(template)
+        root.header_template = template
+    except (OSError, UnicodeDecodeError, TemplateError) as e:
+        messagebox.showerror("Error", f"Could not load the header template, using the default format:\n{e}")
+
+def current_format():
+    """Returns the header format of the open directory."""
+    return getattr(root, 'header_format', DEFAULT_FORMAT)
+
+def poll_directory_scan(scan):
+    """Inserts the files found so far by a scan into the tree view, then reschedules itself until the scan is done."""
+    if getattr(root, 'directory_scan', None) is not scan:
+        return  # The scan was cancelled or replaced
+
+    # Leave time for the UI between polls, the rest of the queue waits for the next one
+    deadline = time.monotonic() + SCAN_POLL_BUDGET_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            item = scan.queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if item is None:
+            finish_directory_scan(scan)
+            return
+        if isinstance(item, Exception):
+            messagebox.showerror("Error", f"Could not scan directory:\n{item}")
+            continue
+
+        # Insert directories and files into the tree view
+        insert_tree_nodes(scan.directory, item)
+        scan.file_count += len(item)
+        if scan.seen is not None:
+            scan.seen.update(relative_path.replace(os.sep, "/") for _, relative_path in item)
+
+    scan_label.config(text=f"{'Checking' if scan.seen is not None else 'Scanning'}... {scan.file_count} files")
+    root.after(SCAN_POLL_MS, poll_directory_scan, scan)
+
+def finish_directory_scan(scan):
+    """Hides the scan progress once a scan has gone through the whole directory."""
+    root.directory_scan = None
+    scan_frame.pack_forget()
+
+    if scan.seen is not None:
+        # Files of the snapshot that the scan did not find anymore
+        for full_path, rel_path in list(root.tree_index.iter_files()):
+            if rel_path not in scan.seen:
+                apply_file_removed(full_path, rel_path)
+
+    if not scan.file_count:
         messagebox.showinfo("No Files Found", "No C++ files found in the selected directory.")
         return
 
-    # Insert directories and files into the tree view
-    insert_tree_nodes(directory, cpp_files)
-
     # Store the last opened directory
-    save_last_opened_directory(directory)
+    save_last_opened_directory(scan.directory)
+    save_session_snapshot()
+    start_index_build()
+    start_watcher(scan.directory)
+
+def cancel_directory_scan():
+    """Stops the running directory scan, keeping the files listed so far."""
+    scan = getattr(root, 'directory_scan', None)
+    if scan is not None:
+        scan.cancel()
+        root.directory_scan = None
+    scan_frame.pack_forget()
+
+# Changes on disk are applied to the tree this often
+WATCH_POLL_MS = 200
+
+def start_watcher(directory):
+    """Starts applying the changes made on disk under directory to the tree, the index and the open file."""
+    import watcher as filesystem_watcher  # Deferred, not needed to show the window
+    stop_watcher()
+    watcher = filesystem_watcher.create_watcher(directory)
+    root.watcher = watcher
+    watcher.start()
+    root.after(WATCH_POLL_MS, poll_watcher, watcher)
+
+def stop_watcher():
+    watcher = getattr(root, 'watcher', None)
+    if watcher is not None:
+        watcher.stop()
+        root.watcher = None
+
+def poll_watcher(watcher):
+    """Applies the changes reported by the watcher so far, then reschedules itself."""
+    import watcher as filesystem_watcher
+    if getattr(root, 'watcher', None) is not watcher:
+        return
 
+    deadline = time.monotonic() + SCAN_POLL_BUDGET_SECONDS
+    while time.monotonic() < deadline:
+        try:
+            kind, full_path, rel_path = watcher.queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if kind == filesystem_watcher.EVENT_RESCAN:
+            open_directory(root.tree_index.directory)
+            return
+        if kind == filesystem_watcher.EVENT_CHANGED:
+            apply_file_changed(full_path, rel_path)
+        elif kind == filesystem_watcher.EVENT_REMOVED:
+            apply_file_removed(full_path, rel_path)
+        elif kind == filesystem_watcher.EVENT_REMOVED_DIR:
+            for file_path, file_rel_path in list(root.tree_index.iter_files(rel_path)):
+                apply_file_removed(file_path, file_rel_path)
+    root.after(WATCH_POLL_MS, poll_watcher, watcher)
+
+def apply_file_changed(full_path, rel_path):
+    """Adds a new file to the tree, re-indexes a modified one and checks the open file against the disk."""
+    node = root.tree_index.get_dir(parent_path(rel_path))
+    if node is None or rel_path.rsplit("/", 1)[-1] not in node.files:
+        insert_tree_nodes(root.tree_index.directory, [(full_path, rel_path)])
+    try:
+        root.header_index.add(rel_path, read_indexed_header(full_path))
+    except (OSError, UnicodeDecodeError):
+        pass  # Gone again or unreadable, a later event tells
+    if full_path == getattr(root, 'current_file', None):
+        check_open_file()
+    else:
+        drop_document(full_path)
+
+def apply_file_removed(full_path, rel_path):
+    """Removes a deleted file from the tree, the index and the header cache."""
+    removed_dirs = root.tree_index.remove_file(rel_path)
+    if root.view_index is not root.tree_index:
+        removed_dirs = root.view_index.remove_file(rel_path)
+    if file_tree.exists(file_item(rel_path)):
+        file_tree.delete(file_item(rel_path))
+    for rel_dir in removed_dirs:
+        if file_tree.exists(dir_item(rel_dir)):
+            file_tree.delete(dir_item(rel_dir))
+        root.shown_dirs.discard(rel_dir)
+    root.header_index.remove(rel_path)
+    header_cache.forget(full_path)
+    if full_path == getattr(root, 'current_file', None):
+        messagebox.showwarning("File Removed", f"{full_path} was deleted or moved away.")
+    else:
+        drop_document(full_path, close=True)
+
+def drop_document(filepath, close=False):
+    """Forgets the loaded document of a file that changed on disk in the background, unless it has unsaved edits.
+
+    Its tab stays, switching to it reads the file again. close also closes
+    the tab, for files that are gone."""
+    document = root.documents.peek(filepath)
+    if document is None or not is_document_dirty(document):
+        root.documents.remove(filepath)
+        if close:
+            remove_tab(filepath)
+
+def file_stat(filepath):
+    """Returns what tells whether a file changed: its modification time and size, None if it is gone."""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def remember_file_stat(filepath):
+    """Records the state of a file as loaded or written by the app."""
+    root.file_stats[filepath] = file_stat(filepath)
+
+def changed_on_disk(filepath):
+    """Checks whether a file changed since the app last loaded or wrote it."""
+    return filepath in root.file_stats and file_stat(filepath) != root.file_stats[filepath]
+
+def check_open_file():
+    """Reloads the open file after it changed on disk, asking first if that would lose header edits."""
+    filepath = root.current_file
+    if not changed_on_disk(filepath):
+        return  # Written by the app itself
+    document = root.documents.peek(filepath)
+    if (document is None or not is_document_dirty(document)
+            or messagebox.askyesno("File Changed", f"{filepath} changed on disk.\n\n"
+                                                    "Reload it and lose your header edits?")):
+        open_file(filepath, reload=True)
+
+def read_indexed_header(filepath):
+    """Returns the parsed header of a file for the search index, None if it has no header."""
+    location, header = header_cache.read_header(filepath, current_format())
+    return header if location.text else None
+
+def start_index_build():
+    """Indexes the headers of every file in the tree in the background, replacing a build still running."""
+    cancel_index_build()
+    build = IndexBuild(list(root.tree_index.iter_files()), read_indexed_header)
+    root.index_build = build
+    build.start()
+    root.after(SCAN_POLL_MS, poll_index_build, build)
+
+def poll_index_build(build):
+    """Adds the headers read so far by an index build to the search index, then reschedules itself until it is done."""
+    if getattr(root, 'index_build', None) is not build:
+        return
+
+    deadline = time.monotonic() + SCAN_POLL_BUDGET_SECONDS
+    index = root.header_index
+    while time.monotonic() < deadline:
+        try:
+            batch = build.queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if batch is None:
+            root.index_build = None
+            show_filter_status()
+            # Matches found while indexing were partial
+            if filter_var.get().strip():
+                apply_filter()
+            return
+        for entry in batch:
+            index.add_entry(*entry)
+        build.done_count += len(batch)
+
+    show_filter_status()
+    root.after(SCAN_POLL_MS, poll_index_build, build)
+
+def cancel_index_build():
+    """Stops the running index build, keeping what was indexed so far."""
+    build = getattr(root, 'index_build', None)
+    if build is not None:
+        build.cancel()
+        root.index_build = None
+
+def update_index(filepath, header):
+    """Re-indexes a file after its header was written."""
+    index = getattr(root, 'header_index', None)
+    if index is None:
+        return
+    rel_path = os.path.relpath(filepath, root.tree_index.directory).replace(os.sep, "/")
+    if rel_path in index.ids:
+        index.add(rel_path, current_format().parse(header) if header else None)
+
+def dir_item(rel_dir):
+    """Returns the tree item id of an indexed directory ("" for the root)."""
+    return "d:" + rel_dir if rel_dir else ""
+
+def file_item(rel_path):
+    """Returns the tree item id of an indexed file."""
+    return "f:" + rel_path
+
+def insert_dir_item(rel_dir):
+    """Inserts a collapsed directory node, with a placeholder child so that it can be expanded."""
+    name = rel_dir.rstrip("/").rsplit("/", 1)[-1]
+    item = file_tree.insert(dir_item(parent_path(rel_dir)), "end", iid=dir_item(rel_dir), text=name, open=False)
+    file_tree.insert(item, "end", iid="p:" + rel_dir, text="")
+
+def insert_file_item(rel_path, full_path):
+    """Inserts a file node under its (already shown) directory."""
+    name = rel_path.rsplit("/", 1)[-1]
+    file_tree.insert(dir_item(parent_path(rel_path)), "end", iid=file_item(rel_path), text=name, values=[full_path])
+
+def show_dir_children(rel_dir):
+    """Fills the tree node of a directory with its subdirectories and files from the index."""
+    node = root.view_index.get_dir(rel_dir)
+    if node is None or rel_dir in root.shown_dirs:
+        return
+    root.shown_dirs.add(rel_dir)
+
+    placeholder = "p:" + rel_dir
+    if file_tree.exists(placeholder):
+        file_tree.delete(placeholder)
+    for name in sorted(node.dirs):
+        insert_dir_item(node.dirs[name].path)
+    for name in sorted(node.files):
+        insert_file_item(rel_dir + name, node.files[name])
+
+def on_tree_open(event):
+    """Populates a directory node the first time it is expanded."""
+    item = file_tree.focus()
+    if item.startswith("d:"):
+        show_dir_children(item[2:])
+
+@traced("insert_tree_nodes")
 def insert_tree_nodes(directory, cpp_files):
-    """Inserts directories and files into the tree view."""
-    file_tree.delete(*file_tree.get_children())  # Clear existing tree
-    
-    # Create a dictionary to store directory nodes
-    dir_nodes = {}
-    
+    """Adds files to the directory index, only inserting tree nodes for directories that are shown."""
+    index = root.tree_index
+    if root.view_index is not index:
+        # A filter is shown, new files appear once it is applied again
+        for full_path, relative_path in cpp_files:
+            index.add_file(full_path, relative_path)
+        return
+    shown_dirs = root.shown_dirs
     for full_path, relative_path in cpp_files:
-        parts = os.path.normpath(relative_path).split(os.sep)
-        
-        # Handle the file path components
-        current_path = ""
-        parent_id = ""
-        
-        # Create/get directory nodes for each level
-        for i, part in enumerate(parts[:-1]):  # All parts except the filename
-            current_path = os.path.join(current_path, part) if current_path else part
-            
-            if current_path not in dir_nodes:
-                # Create new directory node
-                dir_nodes[current_path] = file_tree.insert(parent_id, "end", text=part, open=True)
-            
-            parent_id = dir_nodes[current_path]
-        
-        # Insert the file under its parent directory (or root if no parent)
-        file_name = parts[-1]
-        if parent_id:  # If we have a parent directory
-            file_tree.insert(parent_id, "end", text=file_name, values=[full_path])
-        else:  # Root level files
-            file_tree.insert("", "end", text=file_name, values=[full_path])
+        # New directories only get a node if their parent is already expanded
+        for rel_dir in index.add_file(full_path, relative_path):
+            if parent_path(rel_dir) in shown_dirs:
+                insert_dir_item(rel_dir)
+
+        rel_path = relative_path.replace(os.sep, "/")
+        if parent_path(rel_path) in shown_dirs and not file_tree.exists(file_item(rel_path)):
+            insert_file_item(rel_path, full_path)
+
+def schedule_filter(*args):
+    """Applies the filter once typing pauses."""
+    pending = getattr(root, 'pending_filter', None)
+    if pending is not None:
+        root.after_cancel(pending)
+    root.pending_filter = root.after(FILTER_DELAY_MS, apply_filter)
+
+@traced("apply_filter")
+def apply_filter():
+    """Narrows the tree view to the files whose header matches the filter box, or shows every file for an empty filter."""
+    root.pending_filter = None
+    index = getattr(root, 'tree_index', None)
+    if index is None:
+        return
+    query = filter_var.get().strip()
+    if not query:
+        view = index
+        root.filter_match_count = None
+    else:
+        try:
+            matches = root.header_index.search(query)
+        except ValueError as e:
+            filter_status.config(text=str(e))
+            return
+        view = TreeIndex(index.directory)
+        for rel_path in matches:
+            node = index.get_dir(parent_path(rel_path))
+            full_path = node.files.get(rel_path.rsplit("/", 1)[-1]) if node is not None else None
+            if full_path is not None:
+                view.add_file(full_path, rel_path)
+        root.filter_match_count = view.file_count
+
+    root.view_index = view
+    root.shown_dirs = {""}
+    file_tree.delete(*file_tree.get_children())
+    show_dir_children("")
+    if view is not index and view.file_count <= FILTER_EXPAND_LIMIT:
+        # Few enough matches to show them all at once
+        for rel_dir in sorted(view.nodes):
+            if rel_dir:
+                show_dir_children(rel_dir)
+                file_tree.item(dir_item(rel_dir), open=True)
+    show_filter_status()
+
+def clear_filter():
+    """Empties the filter box without filtering again."""
+    pending = getattr(root, 'pending_filter', None)
+    if pending is not None:
+        root.after_cancel(pending)
+        root.pending_filter = None
+    root.filter_match_count = None
+    if filter_var.get():
+        filter_var.set("")
+        root.after_cancel(root.pending_filter)  # Scheduled by the variable trace
+        root.pending_filter = None
+    show_filter_status()
+
+def show_filter_status():
+    """Shows the number of matches of the filter and the progress of the index build."""
+    parts = []
+    count = getattr(root, 'filter_match_count', None)
+    if count is not None:
+        parts.append(f"{count} matches")
+    build = getattr(root, 'index_build', None)
+    if build is not None:
+        parts.append(f"indexing {build.done_count}/{len(build.files)}")
+    filter_status.config(text=", ".join(parts))
 
 def open_selected_file(event):
     """Opens the file selected in the tree view."""
@@ -86,180 +524,263 @@ def open_selected_file(event):
             filepath = file_info[0]  # Get the file path
             open_file(filepath)
 
-def create_header_template(filename=""):
-    """Creates the header template with the given filename."""
-    current_year = datetime.now().year
-    return f"""// Team Name [website]
-// {filename}
-// 
-// Description goes here, will automatically wrap at 80 characters when displaying
-// in the editor. You can use multiple lines for the description.
-//
-// AUTHORS
-// [50] First Last (first.l@digipen.edu)
-//   - Contribution description point
-// [50] First Last (first.l@digipen.edu)
-//   - Contribution description point
-// 
-// Copyright (c) {current_year} DigiPen, All rights reserved.
-"""
-
-def open_file(filepath):
-    """Opens the selected file in the text editor."""
+@traced("open_file")
+def open_file(filepath, reload=False):
+    """Opens a file in the text editor.
+
+    Files open in a tab are switched to without being read again, unless
+    they changed on disk. reload reads the file again, dropping its edits."""
     try:
-        with open(filepath, "r", encoding="utf-8") as file:
-            content = file.read()
-            
-            # Split content into header and code
-            lines = content.split('\n')
-            header_end = 0
-            
-            # Find the end of the header comment (look for copyright line)
-            for i, line in enumerate(lines):
-                if "Copyright (c)" in line:
-                    header_end = i + 1
-                    break
-            
-            # Separate header and code
-            header = '\n'.join(lines[:header_end])
-            code = '\n'.join(lines[header_end:]).strip()
-            
-            # Parse header content to fill form fields
-            parse_header_to_form(header)
-            
-            # Update header preview
-            header_text.config(state="normal")
-            header_text.delete("1.0", tk.END)
-            header_text.insert(tk.END, header)
-            header_text.config(state="disabled")
-            
-            # Update code area
-            code_area.config(state="normal")
-            code_area.delete("1.0", tk.END)
-            code_area.insert(tk.END, code)
-            code_area.config(state="disabled")
-            
-        root.title(f"Text Editor - {filepath}")
-        root.current_file = filepath
-        
+        if reload:
+            root.documents.remove(filepath)
+        elif filepath != getattr(root, 'current_file', None):
+            stash_current_document()
+        stat = file_stat(filepath)
+        if stat is None:
+            raise FileNotFoundError(f"{filepath} does not exist")
+
+        document = root.documents.get(filepath, stat)
+        if document is None:
+            # Unchanged files get their header from the cache without being parsed again
+            location, parsed = header_cache.read_header(filepath, current_format())
+            document = Document(filepath, stat, location, parsed)
+            autosave_writer.mark_saved(filepath, location.text)
+            for evicted in root.documents.put(document):
+                remove_tab(evicted.filepath)
+        root.file_stats[filepath] = document.stat
+        show_document(document)
+
+        if document.stat != stat:
+            check_open_file()  # Changed on disk while it had unsaved edits
     except Exception as e:
         messagebox.showerror("Error", f"Could not open file:\n{e}")
 
-def parse_header_to_form(header):
-    """Parses the header comment and fills the form fields."""
-    # Clear existing authors except the first one
-    while len(header_form.author_frames) > 1:
-        header_form.remove_author_frame()
-    
-    lines = header.split('\n')
-    description_start = False
-    description_end = False
-    description_lines = []
-    author_count = 1
-    current_author = None
-    contribution_points_count = 0
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line.startswith('//'):
-            continue
-            
-        raw_content = line[3:] if line.startswith('// ') else line[2:]
-        content = line[2:].strip()
-        
-        # Parse team and website from first line
-        if '[' in content and ']' in content and not content.startswith('['):
-            team_name = content.split('[')[0].strip()
-            website = content.split('[')[1].split(']')[0].strip()
-            header_form.team_name.delete(0, tk.END)
-            header_form.team_name.insert(0, team_name)
-            header_form.website.delete(0, tk.END)
-            header_form.website.insert(0, website)
-            continue
-        
-        # Handle description section
-        if content == "" and not description_start and not description_end:
-            # First empty line after file name, start collecting description
-            description_start = True
-            continue
-        
-        # Stop collecting description when we hit AUTHORS
-        if content == "AUTHORS":
-            description_end = True
-            if description_lines and description_lines[-1] == "":
-                description_lines.pop()  # Remove extra empty line
-            continue
-        
-        # Collect description lines including empty lines and preserve indentation
-        if description_start and not description_end:
-            description_lines.append(raw_content)
-            continue
+def stash_current_document():
+    """Keeps the edits and the loaded code of the open file in its document, to show them again later."""
+    document = root.documents.peek(getattr(root, 'current_file', None))
+    if document is None:
+        return
+    if getattr(root, 'pending_header_update', None) is not None:
+        root.after_cancel(root.pending_header_update)
+        run_header_update()
+    document.edited = header_form.get_header()
+    document.rendered = header_form.rendered_header
+    document.window = root.code_window
+    document.code = code_area.get("1.0", "end-1c") if root.code_window is not None else None
+    document.code_view = code_area.yview()[0]
+
+def show_document(document):
+    """Shows a document in the form, the preview and the code area."""
+    fill_header_form(document.edited if document.edited is not None else document.header)
+    show_parse_errors(document.header.errors)
+    if document.saved_header is None:
+        document.saved_header = header_form.get_header()
+
+    header_text.config(state="normal")
+    header_text.delete("1.0", tk.END)
+    header_text.insert(tk.END, document.rendered)
+    header_text.config(state="disabled")
+    header_form.rendered_header = document.rendered
+
+    root.title(f"Text Editor - {document.filepath}")
+    root.current_file = document.filepath
+    show_tab(document.filepath)
+
+    if document.window is not None and not header_only_var.get():
+        # The code loaded before is shown again, more is read from where it stopped
+        code_area.config(state="normal")
+        code_area.delete("1.0", tk.END)
+        code_area.insert(tk.END, document.code)
+        code_area.config(state="disabled")
+        code_area.yview_moveto(document.code_view)
+        root.code_window = document.window
+    else:
+        # The code is only read as far as it is scrolled
+        show_code(document.filepath)
+
+def is_document_dirty(document):
+    """Checks whether a document has header edits that are not on disk.
+
+    The form fields are compared with the ones of the last load or save.
+    The rendered text is no use for that, rendering it again already
+    changes it (current year, description wrapping)."""
+    if document.filepath == getattr(root, 'current_file', None):
+        edited, rendered = header_form.get_header(), header_form.rendered_header
+    else:
+        edited, rendered = document.edited, document.rendered
+    if edited is None or edited == document.saved_header:
+        return False
+    return not autosave_writer.is_saved(document.filepath, rendered)  # Written by auto save
 
-        # Parse authors
-        if content.startswith('['):
+def show_tab(filepath):
+    """Selects the tab of a file, adding one if it has none."""
+    frame = root.tab_frames.get(filepath)
+    if frame is None:
+        frame = tk.Frame(tab_bar, height=0)
+        tab_bar.add(frame, text=os.path.basename(filepath))
+        root.tab_frames[filepath] = frame
+    if tab_bar.select() != str(frame):
+        tab_bar.select(frame)
+    update_tab_title(filepath)
+
+def update_tab_title(filepath):
+    """Marks the tab of a file with '*' while it has unsaved header edits."""
+    frame = root.tab_frames.get(filepath)
+    document = root.documents.peek(filepath)
+    if frame is not None and document is not None:
+        dirty = is_document_dirty(document)
+        tab_bar.tab(frame, text=os.path.basename(filepath) + (" *" if dirty else ""))
+
+def remove_tab(filepath):
+    frame = root.tab_frames.pop(filepath, None)
+    if frame is not None:
+        tab_bar.forget(frame)
+        frame.destroy()
+
+def on_tab_changed(event):
+    """Switches to the file of the tab selected by the user."""
+    selected = tab_bar.select()
+    for filepath, frame in root.tab_frames.items():
+        if str(frame) == selected:
+            if filepath != getattr(root, 'current_file', None):
+                open_file(filepath)
+            return
+
+def on_tab_middle_click(event):
+    """Closes the tab under the mouse."""
+    try:
+        index = tab_bar.index(f"@{event.x},{event.y}")
+    except tk.TclError:
+        return  # Not on a tab
+    selected = tab_bar.tabs()[index]
+    for filepath, frame in list(root.tab_frames.items()):
+        if str(frame) == selected:
+            close_tab(filepath)
+            return
+
+def close_tab(filepath=None):
+    """Closes the tab of a file (the open one by default), asking to save its header edits first.
+
+    Returns False if the user cancelled."""
+    filepath = filepath or getattr(root, 'current_file', None)
+    document = root.documents.peek(filepath)
+    if document is None:
+        if filepath not in root.tab_frames:
+            return True
+    elif filepath == getattr(root, 'current_file', None):
+        stash_current_document()
+    if document is not None and is_document_dirty(document):
+        answer = messagebox.askyesnocancel("Unsaved Changes",
+                                           f"Save the header changes of {os.path.basename(filepath)}?")
+        if answer is None:
+            return False
+        if answer:
             try:
-                # Extract percentage (remove the [] and trim)
-                percentage = content[1:].split(']')[0].strip()
-                percentage = percentage.replace('%', '')  # Remove % if present
-                remaining = content.split(']')[1].strip()
-                
-                # Extract name and email
-                name = remaining.split('(')[0].strip()
-                email = remaining.split('(')[1].split('@')[0].strip().replace('\\', '')  # Remove escape character
-                
-                # Get or create author frame
-                if len(header_form.author_frames) < author_count:
-                    header_form.add_author_frame()
-                
-                current_author = header_form.author_frames[-1]
-                current_author['contribution'].delete(0, tk.END)
-                current_author['contribution'].insert(0, percentage)
-                current_author['name'].delete(0, tk.END)
-                current_author['name'].insert(0, name)
-                current_author['email'].delete(0, tk.END)
-                current_author['email'].insert(0, email)
-                
-                # Clear any existing contribution points
-                for point in current_author['contribution_points']:
-                    point['frame'].destroy()
-                current_author['contribution_points'].clear()
-
-                author_count += 1
+                save_header(filepath, document.rendered)
             except Exception as e:
-                print(f"Error parsing author line: {e}")
-                continue
-        
-        # Parse contribution points
-        if content.startswith('-') and current_author is not None:
-            desc = content[1:].strip()
+                messagebox.showerror("Error", f"Could not save file:\n{e}")
+                return False
 
-            # Add contribution point to the current author
-            header_form.add_contribution_point(current_author['points_container'])
+    root.documents.remove(filepath)
+    remove_tab(filepath)
+    if filepath == getattr(root, 'current_file', None):
+        if root.tab_frames:
+            open_file(list(root.tab_frames)[-1])
+        else:
+            clear_editor()
+    return True
 
-            current_author['contribution_points'][-1]['entry'].delete(0, tk.END)
-            current_author['contribution_points'][-1]['entry'].insert(0, desc)
+def close_all_tabs():
+    """Closes every tab, returning False if the user cancelled on one with unsaved edits."""
+    return all(close_tab(filepath) for filepath in list(root.tab_frames))
 
-            contribution_points_count += 1
-    
-    # Update description text
-    header_form.description.delete("1.0", tk.END)
-    if description_lines:
-        header_form.description.insert("1.0", '\n'.join(description_lines))
+def clear_editor():
+    """Empties the form, the preview and the code area once no file is open."""
+    del root.current_file
+    fill_header_form(Header())
+    show_parse_errors([])
+    header_text.config(state="normal")
+    header_text.delete("1.0", tk.END)
+    header_text.config(state="disabled")
+    header_form.rendered_header = ""
+    code_area.config(state="normal")
+    code_area.delete("1.0", tk.END)
+    code_area.config(state="disabled")
+    root.code_window = None
+    root.title("Header Commenter")
 
+def show_parse_errors(errors):
+    """Lists the header lines that could not be parsed in the title of the header preview."""
+    if not errors:
+        header_preview_frame.config(text="Header Preview")
+        return
+    details = "; ".join(str(error) for error in errors[:3]) + ("; ..." if len(errors) > 3 else "")
+    header_preview_frame.config(text=f"Header Preview - {len(errors)} unparsed line(s): {details}")
+
+def show_code(filepath):
+    """Starts showing the code of a file in the code area, unless in header only mode."""
+    code_area.config(state="normal")
+    code_area.delete("1.0", tk.END)
+    code_area.config(state="disabled")
+    root.code_window = None if header_only_var.get() else FileWindow(filepath, end_marker=current_format().end_marker)
+    load_code_page()
+
+def load_code_page():
+    """Appends the next page of code to the code area."""
+    root.pending_code_page = None
+    code_window = getattr(root, 'code_window', None)
+    if code_window is None:
+        return
+    try:
+        code = code_window.read_page()
+    except OSError as e:
+        root.code_window = None
+        messagebox.showerror("Error", f"Could not read file:\n{e}")
+        return
+    if code:
+        code_area.config(state="normal")
+        code_area.insert(tk.END, code)
+        code_area.config(state="disabled")
+
+def on_code_scroll(first, last):
+    """Loads more code when the code area is scrolled close to the end of what is loaded."""
+    code_scrollbar.set(first, last)
+    code_window = getattr(root, 'code_window', None)
+    if (code_window is not None and not code_window.exhausted and float(last) >= CODE_PREFETCH_FRACTION
+            and getattr(root, 'pending_code_page', None) is None):
+        root.pending_code_page = root.after_idle(load_code_page)
+
+def on_header_only_toggle():
+    """Hides the code area and stops reading code in header only mode."""
+    if header_only_var.get():
+        code_frame.pack_forget()
+        root.code_window = None
+        code_area.config(state="normal")
+        code_area.delete("1.0", tk.END)
+        code_area.config(state="disabled")
+    else:
+        code_frame.pack(side="bottom", fill="both", expand=True, padx=5, pady=5)
+        if hasattr(root, 'current_file'):
+            show_code(root.current_file)
+
+@traced("fill_header_form")
+def fill_header_form(parsed):
+    """Fills the form fields from a parsed Header."""
+    header_form.set_header(parsed)
+
+@traced("save_file")
 def save_file(event=None):
     """Saves the content directly to the current file."""
     if hasattr(root, 'current_file'):
+        if changed_on_disk(root.current_file) and not messagebox.askyesno(
+                "File Changed", f"{root.current_file} changed on disk since it was opened.\n\n"
+                                "Overwrite its header anyway?"):
+            return
         try:
             # Update the header text to ensure it's up to date
             header_form.update_header_text()
 
-            # Combine header and code with a newline in between
-            header_content = header_text.get("1.0", "end-1c")
-            code_content = code_area.get("1.0", "end-1c")
-            content = f"{header_content}\n\n{code_content}"
-            
-            with open(root.current_file, "w", encoding="utf-8") as file:
-                file.write(content)
+            save_header(root.current_file, header_text.get("1.0", "end-1c"))
             
             #messagebox.showinfo("Success", "File saved successfully!")
         except Exception as e:
@@ -267,6 +788,112 @@ def save_file(event=None):
     else:
         messagebox.showwarning("Warning", "No file is currently open.")
 
+def save_header(filepath, header_content):
+    """Writes a header to a file and brings the caches, the index and its tab up to date."""
+    # Only the header is rewritten, the code is copied from the file as is
+    old = write_header(filepath, header_content, end_marker=current_format().end_marker)
+    journal_save("Save", filepath, old, header_content)
+    remember_file_stat(filepath)
+    header_cache.forget(filepath)
+    update_index(filepath, header_content)
+    autosave_writer.mark_saved(filepath, header_content)
+    document = root.documents.peek(filepath)
+    if document is not None:
+        document.stat = root.file_stats[filepath]
+        document.rendered = header_content
+        document.saved_header = header_form.get_header() if filepath == getattr(root, 'current_file', None) else document.edited
+    update_tab_title(filepath)
+
+def schedule_header_update(event=None):
+    """Updates the header preview once Tk is idle, merging the keystrokes that came in before."""
+    if getattr(root, 'pending_header_update', None) is None:
+        root.pending_header_update = root.after_idle(run_header_update)
+
+def run_header_update():
+    """Refreshes the header preview and hands the header to the autosave writer if auto save is on."""
+    root.pending_header_update = None
+    header_form.update_header_text()
+    if auto_save_var.get() and hasattr(root, 'current_file'):
+        autosave_writer.submit(root.current_file, header_form.rendered_header)
+        update_index(root.current_file, header_form.rendered_header)
+    if hasattr(root, 'current_file'):
+        update_tab_title(root.current_file)
+
+def autosave_write(filepath, header):
+    """Writes a header from the autosave thread, unless the file changed on disk in the meantime."""
+    if changed_on_disk(filepath):
+        raise OSError("the file changed on disk, reopen it or save it with Ctrl + S")
+    old = write_header(filepath, header, end_marker=current_format().end_marker)
+    journal_save("Auto save", filepath, old, header)
+    remember_file_stat(filepath)
+    header_cache.forget(filepath)
+
+def journal_save(label, filepath, old, new):
+    """Records a save in the undo journal. A journal that cannot be written does not fail the save."""
+    if old == new:
+        return
+    try:
+        journal.record(label, filepath, old, new, current_format().end_marker)
+    except OSError:
+        pass
+
+def finish_journal_batch(job, batch):
+    """Ends the journal batch of a bulk job once its worker processes stopped recording into it."""
+    if job is not None and job.thread.is_alive():
+        root.after(SCAN_POLL_MS, finish_journal_batch, job, batch)
+        return
+    try:
+        journal.finish_batch(batch)
+    except OSError:
+        pass  # Ended by age when the journal is trimmed
+
+def drain_job(job, apply_result, on_done=None):
+    """Keeps applying the results of a bulk or rollback job whose dialog was closed, until the job is done.
+
+    Cancelling only stops handing out work, the files already being written
+    still are and must reach the editor. on_done is called at the end."""
+    while True:
+        try:
+            results = job.queue.get_nowait()
+        except queue.Empty:
+            root.after(SCAN_POLL_MS, drain_job, job, apply_result, on_done)
+            return
+        if results is None:
+            break
+        for filepath, status, detail in results:
+            apply_result(filepath, status, detail)
+    if on_done is not None:
+        on_done()
+
+def apply_header_written(filepath, header=None):
+    """Brings the caches, the index and the open files up to date after a bulk edit or rollback wrote a header.
+
+    header is the text written, it is read back from the file if not given."""
+    header_cache.forget(filepath)
+    if header is None:
+        try:
+            header = header_cache.read_header(filepath, current_format())[0].text
+        except (OSError, UnicodeDecodeError):
+            pass  # Gone again or unreadable, the watcher tells
+    if header is not None:
+        update_index(filepath, header)
+    if filepath == getattr(root, 'current_file', None):
+        check_open_file()
+    else:
+        drop_document(filepath)
+
+def poll_autosave_errors():
+    """Reports the errors of the autosave thread on the Tk main thread."""
+    try:
+        while True:
+            filepath, error = autosave_writer.errors.get_nowait()
+            messagebox.showerror("Error", f"Could not auto save {filepath}:\n{error}")
+    except queue.Empty:
+        pass
+    if hasattr(root, 'current_file'):
+        update_tab_title(root.current_file)  # Written by the autosave thread in the meantime
+    root.after(AUTOSAVE_POLL_MS, poll_autosave_errors)
+
 class HeaderForm(tk.Frame):
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -275,6 +902,12 @@ class HeaderForm(tk.Frame):
         # Store authors frames for dynamic addition/removal
         self.author_frames = []
         
+        # Hidden author frames kept for reuse instead of being destroyed
+        self.author_pool = []
+        
+        # Last header shown in the preview, to skip redrawing an unchanged one
+        self.rendered_header = None
+        
         # Create form fields
         self.create_form_fields()
 
@@ -317,7 +950,26 @@ class HeaderForm(tk.Frame):
         tk.Button(btn_frame, text="Remove Author", command=self.remove_author_frame,
                  bg=MENU_COLOR, fg=TEXT_COLOR).pack(side="left")
 
+    def find_author(self, container):
+        """Returns the author frame owning a contribution points container."""
+        for author in self.author_frames:
+            if author['points_container'] == container:
+                return author
+        return None
+
     def add_contribution_point(self, container):
+        author = self.find_author(container)
+        if author is None:
+            return
+        
+        # Reuse a hidden point row if there is one
+        if author['point_pool']:
+            point_data = author['point_pool'].pop()
+            point_data['entry'].delete(0, tk.END)
+            point_data['frame'].pack(fill="x", pady=1)
+            author['contribution_points'].append(point_data)
+            return
+        
         point_frame = tk.Frame(container, bg=BG_COLOR)
         point_frame.pack(fill="x", pady=1)
         
@@ -326,24 +978,34 @@ class HeaderForm(tk.Frame):
         point_entry.pack(side="left", fill="x", expand=True, padx=5)
         point_entry.bind("<KeyRelease>", lambda e: self.update_header_text)
         
-        # Find the corresponding author frame and add this point to their list
-        for author in self.author_frames:
-            if author['points_container'] == container:
-                author['contribution_points'].append({
-                    'frame': point_frame,
-                    'entry': point_entry
-                })
-                break
+        author['contribution_points'].append({
+            'frame': point_frame,
+            'entry': point_entry
+        })
+
+    def hide_contribution_point(self, author):
+        """Hides the last contribution point of an author, keeping its row for reuse."""
+        point_data = author['contribution_points'].pop()
+        point_data['frame'].pack_forget()
+        author['point_pool'].append(point_data)
 
     def remove_contribution_point(self, container):
-        for author in self.author_frames:
-            if author['points_container'] == container:
-                if len(author['contribution_points']) > 1:  # Keep at least one point
-                    point_data = author['contribution_points'].pop()
-                    point_data['frame'].destroy()
-                break
+        author = self.find_author(container)
+        if author is not None and len(author['contribution_points']) > 1:  # Keep at least one point
+            self.hide_contribution_point(author)
 
     def add_author_frame(self):
+        # Reuse a hidden author frame if there is one
+        if self.author_pool:
+            author = self.author_pool.pop()
+            for field in ('contribution', 'name', 'email'):
+                author[field].delete(0, tk.END)
+            while author['contribution_points']:
+                self.hide_contribution_point(author)
+            author['frame'].pack(fill="x", pady=2)
+            self.author_frames.append(author)
+            return
+        
         author_frame = tk.Frame(self.authors_container, bg=BG_COLOR)
         author_frame.pack(fill="x", pady=2)
         
@@ -400,76 +1062,78 @@ class HeaderForm(tk.Frame):
             'name': name,
             'email': email,
             'points_container': points_container,
-            'contribution_points': []  # Will store the Entry widgets for contribution points
+            'contribution_points': [],  # Will store the Entry widgets for contribution points
+            'point_pool': []            # Hidden contribution points kept for reuse
         })
 
     def remove_author_frame(self):
         if len(self.author_frames) > 1:  # Keep at least one author
             author_data = self.author_frames.pop()
-            author_data['frame'].destroy()
+            author_data['frame'].pack_forget()
+            self.author_pool.append(author_data)
+
+    def set_entry(self, entry, value):
+        """Sets the text of an Entry, leaving it untouched if it already holds value."""
+        if entry.get() != value:
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
+
+    def set_header(self, header):
+        """Binds the form to a Header, only touching the widgets whose value differs.
 
+        Team and website keep their current values if they are None, and the
+        first author keeps its values if the header has no authors."""
+        if header.team is not None:
+            self.set_entry(self.team_name, header.team)
+        if header.website is not None:
+            self.set_entry(self.website, header.website)
+        
+        # Show exactly one row per author, at least one
+        while len(self.author_frames) > max(1, len(header.authors)):
+            self.remove_author_frame()
+        while len(self.author_frames) < len(header.authors):
+            self.add_author_frame()
+        
+        for row, author in zip(self.author_frames, header.authors):
+            self.set_entry(row['contribution'], author.percent)
+            self.set_entry(row['name'], author.name)
+            self.set_entry(row['email'], author.email)
+            
+            # Show exactly one row per contribution point
+            while len(row['contribution_points']) > len(author.points):
+                self.hide_contribution_point(row)
+            while len(row['contribution_points']) < len(author.points):
+                self.add_contribution_point(row['points_container'])
+            for point_data, point in zip(row['contribution_points'], author.points):
+                self.set_entry(point_data['entry'], point)
+        
+        # Update description text
+        if self.description.get("1.0", "end-1c") != header.description:
+            self.description.delete("1.0", tk.END)
+            if header.description:
+                self.description.insert("1.0", header.description)
+
+    def get_header(self):
+        """Builds a Header from the current form values."""
+        authors = []
+        for author in self.author_frames:
+            authors.append(Author(author['contribution'].get(),
+                                  author['name'].get(),
+                                  author['email'].get(),
+                                  [point['entry'].get() for point in author['contribution_points']]))
+        return Header(team=self.team_name.get(),
+                      website=self.website.get(),
+                      description=self.description.get("1.0", "end-1c"),
+                      authors=authors)
+
+    @traced("update_header_text")
     def update_header_text(self):
       """Updates the header text area with the current form values."""
       filename = os.path.basename(root.current_file) if hasattr(root, 'current_file') else "filename.ext"
-      year = datetime.now().year
-      
-      # Build header comment
-      header = f"// {self.team_name.get()} [{self.website.get()}]\n"
-      header += f"// {filename}\n"
-      header += "//\n"
-      
-      # Add description (wrap at 80 chars)
-      desc_text = self.description.get("1.0", tk.END)
-      wrapped_lines = []
-
-      # Parse by line
-      for line in desc_text.split('\n'):
-          # Split line into words
-          words = line.split()
-          current_line = ""
-
-          # Get the characters before the first non-space character
-          prefix = line[:len(line) - len(line.lstrip())]
-
-          for word in words:
-              # Check if adding the word will exceed the 80 char limit
-              if len(current_line) + len(word) + 1 <= 80:
-                  current_line += word + " "
-              else:
-                  # remove the last space
-                  current_line = current_line[:-1]
-                  # Add back the prefix
-                  wrapped_lines.append(prefix + current_line)
-                  current_line = word + " "
-
-          # Add the last line
-          wrapped_lines.append(prefix + current_line)
-
-      if wrapped_lines:
-        wrapped_lines.pop()  # Remove the last empty line
-      # Join all wrapped lines with the comment prefix
-      header += "// " + "\n// ".join(wrapped_lines) + "\n"
-      
-      header += "//\n"
-      
-      # Add authors
-      header += "// AUTHORS\n"
-      for author in self.author_frames:
-          contrib = author['contribution'].get().strip()
-          name = author['name'].get().strip()
-          email = author['email'].get().strip()
-          
-          # Add author line
-          header += f"// [{contrib}%] {name} ({email}\\@digipen.edu)\n"
-          
-          # Add contribution points
-          for point in author['contribution_points']:
-              point_text = point['entry'].get().strip()
-              if point_text:  # Only add non-empty points
-                  header += f"//   - {point_text}\n"
-      
-      header += "//\n"
-      header += f"// Copyright (c) {year} DigiPen, All rights reserved."
+      header = current_format().render(self.get_header(), filename=filename)
+      if header == self.rendered_header:
+          return
+      self.rendered_header = header
       
       # Update header text area
       header_text.config(state="normal")
@@ -477,10 +1141,485 @@ class HeaderForm(tk.Frame):
       header_text.insert("1.0", header)
       header_text.config(state="disabled")
 
-# GUI Setup
-root = tk.Tk()
-root.title("Header Commenter")
-root.geometry("1000x800")
+class BulkEditDialog(tk.Toplevel):
+    """Applies a field change to the headers of many files, with a dry run diff before anything is written."""
+    def __init__(self, parent, paths):
+        super().__init__(parent, bg=BG_COLOR)
+        self.title(f"Bulk Edit - {len(paths)} files")
+        self.geometry("800x600")
+        self.paths = paths
+        self.job = None
+        self.batch = None
+        
+        fields_frame = tk.Frame(self, bg=BG_COLOR)
+        fields_frame.pack(fill="x", padx=5, pady=5)
+        self.entries = {}
+        for row, (key, label) in enumerate([("team", "Team Name:"), ("website", "Website:"), ("year", "Year:"),
+                                            ("percent", "New Author %:"), ("name", "New Author Name:"),
+                                            ("email", "New Author Email:"), ("point", "New Author Point:")]):
+            tk.Label(fields_frame, text=label, bg=BG_COLOR, fg=TEXT_COLOR).grid(row=row, column=0, sticky="w")
+            entry = tk.Entry(fields_frame, bg=BG_COLOR, fg=TEXT_COLOR, insertbackground=CURSOR_COLOR)
+            entry.grid(row=row, column=1, sticky="ew", padx=5, pady=1)
+            self.entries[key] = entry
+        fields_frame.columnconfigure(1, weight=1)
+        tk.Label(fields_frame, text="Empty fields are left unchanged.", bg=BG_COLOR, fg=TEXT_COLOR).grid(
+            row=len(self.entries), column=0, columnspan=2, sticky="w")
+        
+        btn_frame = tk.Frame(self, bg=BG_COLOR)
+        btn_frame.pack(fill="x", padx=5, pady=2)
+        self.preview_button = tk.Button(btn_frame, text="Preview", command=lambda: self.start(write=False),
+                                        bg=MENU_COLOR, fg=TEXT_COLOR)
+        self.preview_button.pack(side="left", padx=5)
+        self.apply_button = tk.Button(btn_frame, text="Apply", command=lambda: self.start(write=True),
+                                      bg=MENU_COLOR, fg=TEXT_COLOR)
+        self.apply_button.pack(side="left")
+        self.cancel_button = tk.Button(btn_frame, text="Cancel", command=self.cancel, state="disabled",
+                                       bg=MENU_COLOR, fg=TEXT_COLOR)
+        self.cancel_button.pack(side="left", padx=5)
+        self.progress_label = tk.Label(btn_frame, text="", bg=BG_COLOR, fg=TEXT_COLOR, anchor="w")
+        self.progress_label.pack(side="left", fill="x", expand=True)
+        
+        self.output = tk.Text(self, wrap="none", font=FONT, bg=BG_COLOR, fg=TEXT_COLOR, state="disabled")
+        self.output.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    def get_edit(self):
+        """Builds the BulkEdit from the dialog fields, or returns None after reporting an invalid field."""
+        import bulk  # Deferred, not needed to show the window
+        values = {key: entry.get().strip() for key, entry in self.entries.items()}
+        year = None
+        if values["year"]:
+            if not values["year"].isdigit():
+                messagebox.showerror("Error", "The year must be a number.", parent=self)
+                return None
+            year = int(values["year"])
+        add_author = None
+        if values["name"]:
+            add_author = Author(values["percent"], values["name"], values["email"],
+                                [values["point"]] if values["point"] else [])
+        return bulk.BulkEdit(team=values["team"] or None, website=values["website"] or None,
+                        year=year, add_author=add_author)
+
+    def start(self, write):
+        """Starts a dry run (write=False) or the real edit in the worker pool."""
+        import bulk
+        edit = self.get_edit()
+        if edit is None:
+            return
+        if edit.is_empty():
+            messagebox.showinfo("Bulk Edit", "Nothing to change.", parent=self)
+            return
+        if write and not messagebox.askyesno("Bulk Edit", f"Rewrite the headers of {len(self.paths)} files?",
+                                             parent=self):
+            return
+        
+        self.output.config(state="normal")
+        self.output.delete("1.0", tk.END)
+        self.output.config(state="disabled")
+        self.counts = {}
+        self.done_count = 0
+        self.write = write
+        self.preview_button.config(state="disabled")
+        self.apply_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        
+        # Written headers go to the undo journal as one batch
+        self.batch = journal.start_batch("Bulk edit") if write else None
+        self.job = bulk.BulkJob(self.paths, edit, write=write, template=getattr(root, 'header_template', None),
+                                journal=self.batch)
+        self.job.start()
+        self.after(SCAN_POLL_MS, self.poll, self.job)
+
+    def poll(self, job):
+        """Shows the results the worker pool produced so far."""
+        import bulk
+        if job is not self.job:
+            return
+        
+        deadline = time.monotonic() + SCAN_POLL_BUDGET_SECONDS
+        lines = []
+        finished = False
+        while time.monotonic() < deadline:
+            try:
+                results = job.queue.get_nowait()
+            except queue.Empty:
+                break
+            if results is None:
+                finished = True
+                break
+            for filepath, status, detail in results:
+                self.done_count += 1
+                self.counts[status] = self.counts.get(status, 0) + 1
+                if status == bulk.STATUS_CHANGED:
+                    lines.append(detail)
+                    if self.write:
+                        apply_header_written(filepath)
+                elif status != bulk.STATUS_UNCHANGED:
+                    lines.append(f"{status}: {filepath} ({detail})")
+        
+        if lines:
+            self.output.config(state="normal")
+            self.output.insert(tk.END, "\n".join(lines) + "\n")
+            self.output.config(state="disabled")
+        
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(self.counts.items()))
+        if finished:
+            self.job = None
+            self.finish_batch()
+            self.preview_button.config(state="normal")
+            self.apply_button.config(state="normal")
+            self.cancel_button.config(state="disabled")
+            stopped = " (cancelled)" if job.cancelled.is_set() else ""
+            verb = "Applied" if self.write else "Previewed"
+            self.progress_label.config(text=f"{verb} {self.done_count}/{len(self.paths)} files{stopped}: {summary}")
+            return
+        
+        self.progress_label.config(text=f"{self.done_count}/{len(self.paths)} files: {summary}")
+        self.after(SCAN_POLL_MS, self.poll, job)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.progress_label.config(text="Cancelling...")
+
+    def finish_batch(self):
+        if self.batch is not None:
+            finish_journal_batch(self.job, self.batch)
+            self.batch = None
+
+    def close(self):
+        import bulk
+        self.cancel()
+        if self.job is not None and self.write:
+            # Headers are still written until the worker pool stops, only then the batch ends
+            def apply_result(filepath, status, detail):
+                if status == bulk.STATUS_CHANGED:
+                    apply_header_written(filepath)
+            job, batch = self.job, self.batch
+            drain_job(job, apply_result, lambda: finish_journal_batch(job, batch))
+            self.job = self.batch = None
+        else:
+            self.finish_batch()
+        self.destroy()
+
+class ReportDialog(tk.Toplevel):
+    """Shows the per-author contribution totals of many files, computed in the worker pool."""
+    def __init__(self, parent, paths):
+        import report  # Deferred, not needed to show the window
+        super().__init__(parent, bg=BG_COLOR)
+        self.title(f"Contribution Report - {len(paths)} files")
+        self.geometry("800x500")
+        self.paths = paths
+        self.report = None
+        self.sort_column = "total_percent"
+        
+        btn_frame = tk.Frame(self, bg=BG_COLOR)
+        btn_frame.pack(fill="x", padx=5, pady=2)
+        self.cancel_button = tk.Button(btn_frame, text="Cancel", command=self.cancel,
+                                       bg=MENU_COLOR, fg=TEXT_COLOR)
+        self.cancel_button.pack(side="left", padx=5)
+        self.export_buttons = [tk.Button(btn_frame, text=f"Export {kind.upper()}...", state="disabled",
+                                         command=lambda kind=kind: self.export(kind), bg=MENU_COLOR, fg=TEXT_COLOR)
+                               for kind in ("csv", "json")]
+        for button in self.export_buttons:
+            button.pack(side="left")
+        self.progress_label = tk.Label(btn_frame, text="", bg=BG_COLOR, fg=TEXT_COLOR, anchor="w")
+        self.progress_label.pack(side="left", fill="x", expand=True, padx=5)
+        
+        self.table = ttk.Treeview(self, columns=report.REPORT_COLUMNS, show="headings")
+        for column in report.REPORT_COLUMNS:
+            self.table.heading(column, text=column.replace("_", " ").capitalize(),
+                               command=lambda column=column: self.sort_by(column))
+            self.table.column(column, width=150 if column in ("name", "email") else 90,
+                              anchor="w" if column in ("name", "email") else "e")
+        self.table.pack(fill="both", expand=True, padx=5, pady=5)
+        
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.job = report.ReportJob(paths, template=getattr(root, 'header_template', None))
+        self.job.start()
+        self.after(SCAN_POLL_MS, self.poll, self.job)
+
+    def poll(self, job):
+        """Shows the progress of the report, then its table once it is done."""
+        if job is not self.job:
+            return
+        done = None
+        while True:
+            try:
+                item = job.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.finish(job)
+                return
+            if isinstance(item, Exception):
+                messagebox.showerror("Error", f"Could not build the report:\n{item}", parent=self)
+            elif isinstance(item, int):
+                done = item
+            else:
+                self.report = item
+        if done is not None:
+            self.progress_label.config(text=f"{done}/{len(self.paths)} files")
+        self.after(SCAN_POLL_MS, self.poll, job)
+
+    def finish(self, job):
+        self.job = None
+        self.cancel_button.config(state="disabled")
+        if self.report is None:
+            return
+        for button in self.export_buttons:
+            button.config(state="normal")
+        stopped = " (cancelled)" if job.cancelled.is_set() else ""
+        self.progress_label.config(text=f"{self.report.files} files{stopped}, {self.report.missing} without header, "
+                                        f"{self.report.errors} unreadable, {len(self.report.authors)} authors")
+        self.show_rows()
+
+    def show_rows(self):
+        """Fills the table, sorted by the last clicked column (text ascending, numbers descending)."""
+        import report
+        self.table.delete(*self.table.get_children())
+        rows = [stats.to_dict() for stats in self.report.authors.values()]
+        if self.sort_column in ("name", "email"):
+            rows.sort(key=lambda row: row[self.sort_column].lower())
+        else:
+            rows.sort(key=lambda row: row[self.sort_column], reverse=True)
+        for row in rows:
+            self.table.insert("", "end", values=[row[column] for column in report.REPORT_COLUMNS])
+
+    def sort_by(self, column):
+        self.sort_column = column
+        if self.report is not None:
+            self.show_rows()
+
+    def export(self, kind):
+        """Saves the report as CSV or JSON."""
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=f".{kind}",
+                                            filetypes=[(kind.upper(), f"*.{kind}")],
+                                            initialfile=f"contributions.{kind}")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                file.write(self.report.to_csv() if kind == "csv" else self.report.to_json() + "\n")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export the report:\n{e}", parent=self)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.progress_label.config(text="Cancelling...")
+
+    def close(self):
+        self.cancel()
+        self.destroy()
+
+class HistoryDialog(tk.Toplevel):
+    """Lists the header saves recorded in the undo journal and rolls back a whole batch or some of its files."""
+    def __init__(self, parent):
+        super().__init__(parent, bg=BG_COLOR)
+        self.title("History")
+        self.geometry("900x600")
+        self.job = None
+        self.entries = []
+        
+        btn_frame = tk.Frame(self, bg=BG_COLOR)
+        btn_frame.pack(fill="x", padx=5, pady=2)
+        self.buttons = [tk.Button(btn_frame, text="Roll Back Batch", command=lambda: self.start(selected_only=False),
+                                  bg=MENU_COLOR, fg=TEXT_COLOR),
+                        tk.Button(btn_frame, text="Roll Back Selected Files",
+                                  command=lambda: self.start(selected_only=True), bg=MENU_COLOR, fg=TEXT_COLOR),
+                        tk.Button(btn_frame, text="Refresh", command=self.refresh, bg=MENU_COLOR, fg=TEXT_COLOR)]
+        for button in self.buttons:
+            button.pack(side="left", padx=(0, 5))
+        self.cancel_button = tk.Button(btn_frame, text="Cancel", command=self.cancel, state="disabled",
+                                       bg=MENU_COLOR, fg=TEXT_COLOR)
+        self.cancel_button.pack(side="left")
+        self.progress_label = tk.Label(btn_frame, text="", bg=BG_COLOR, fg=TEXT_COLOR, anchor="w")
+        self.progress_label.pack(side="left", fill="x", expand=True, padx=5)
+        
+        panes = tk.PanedWindow(self, orient="vertical", bg=BG_COLOR)
+        panes.pack(fill="both", expand=True, padx=5, pady=5)
+        self.batch_table = ttk.Treeview(panes, columns=("time", "change", "files", "first_file"), show="headings",
+                                        selectmode="browse")
+        for column, heading, width in [("time", "Time", 140), ("change", "Change", 90), ("files", "Files", 60),
+                                       ("first_file", "First File", 500)]:
+            self.batch_table.heading(column, text=heading)
+            self.batch_table.column(column, width=width, anchor="e" if column == "files" else "w")
+        self.batch_table.bind("<<TreeviewSelect>>", self.show_entries)
+        self.entry_table = ttk.Treeview(panes, columns=("file",), show="headings")
+        self.entry_table.heading("file", text="File")
+        self.entry_table.bind("<<TreeviewSelect>>", self.show_diff)
+        self.diff = tk.Text(panes, wrap="none", font=FONT, bg=BG_COLOR, fg=TEXT_COLOR, height=12, state="disabled")
+        for pane in (self.batch_table, self.entry_table, self.diff):
+            panes.add(pane)
+        
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def refresh(self):
+        """Lists the batches of the journal, newest first."""
+        self.batch_table.delete(*self.batch_table.get_children())
+        for info in journal.batches():
+            self.batch_table.insert("", "end", iid=str(info.batch), values=(
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(info.time)), info.label, info.count,
+                info.first_file))
+        self.show_entries()
+
+    def show_entries(self, event=None):
+        """Lists the files saved by the selected batch."""
+        selection = self.batch_table.selection()
+        self.entries = journal.entries(int(selection[0])) if selection else []
+        self.entry_table.delete(*self.entry_table.get_children())
+        for i, entry in enumerate(self.entries):
+            self.entry_table.insert("", "end", iid=str(i), values=(entry.filepath,))
+        self.show_diff()
+
+    def show_diff(self, event=None):
+        """Shows what the save of the selected file changed in its header."""
+        import bulk  # Deferred, not needed to show the window
+        selection = self.entry_table.selection()
+        text = ""
+        if selection:
+            entry = self.entries[int(selection[0])]
+            text = bulk.header_diff(entry.filepath, entry.old, entry.new)
+        self.diff.config(state="normal")
+        self.diff.delete("1.0", tk.END)
+        self.diff.insert(tk.END, text)
+        self.diff.config(state="disabled")
+
+    def start(self, selected_only):
+        """Rolls back the selected batch, or only the files selected in it, on a worker thread."""
+        entries = [self.entries[int(i)] for i in self.entry_table.selection()] if selected_only else self.entries
+        if not entries:
+            messagebox.showinfo("History", "Select a batch first." if not selected_only else "Select files first.",
+                                parent=self)
+            return
+        if not messagebox.askyesno("History", f"Put back the headers {len(entries)} file(s) had before this change?",
+                                   parent=self):
+            return
+        
+        self.counts = {}
+        for button in self.buttons:
+            button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.job = RollbackJob(journal, entries)
+        self.job.start()
+        self.after(SCAN_POLL_MS, self.poll, self.job)
+
+    def poll(self, job):
+        """Applies the rolled back headers to the editor as they come in."""
+        if job is not self.job:
+            return
+        finished = False
+        while True:
+            try:
+                results = job.queue.get_nowait()
+            except queue.Empty:
+                break
+            if results is None:
+                finished = True
+                break
+            for filepath, status, detail in results:
+                self.counts[status] = self.counts.get(status, 0) + 1
+                if status == STATUS_REVERTED:
+                    apply_header_written(filepath, detail)
+        
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(self.counts.items()))
+        if finished:
+            self.job = None
+            for button in self.buttons:
+                button.config(state="normal")
+            self.cancel_button.config(state="disabled")
+            stopped = " (cancelled)" if job.cancelled.is_set() else ""
+            self.progress_label.config(text=f"Rolled back{stopped}: {summary}")
+            self.refresh()
+            return
+        self.progress_label.config(text=summary)
+        self.after(SCAN_POLL_MS, self.poll, job)
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+            self.progress_label.config(text="Cancelling...")
+
+    def close(self):
+        self.cancel()
+        if self.job is not None:
+            def apply_result(filepath, status, detail):
+                if status == STATUS_REVERTED:
+                    apply_header_written(filepath, detail)
+            drain_job(self.job, apply_result)
+            self.job = None
+        self.destroy()
+
+def poll_timings():
+    """Shows the most recent timing spans in the status bar while timings are recorded."""
+    if not tracer.enabled:
+        return
+    status_label.config(text="  |  ".join(f"{name} {ms:.1f} ms" for name, ms in tracer.recent(STATUS_TIMINGS)))
+    root.after(STATUS_POLL_MS, poll_timings)
+
+def on_record_timings_toggle():
+    """Turns the timing spans and their status bar on or off."""
+    tracer.enabled = record_timings_var.get()
+    if tracer.enabled:
+        status_frame.pack(side="bottom", fill="x", before=frame)
+        poll_timings()
+    else:
+        status_frame.pack_forget()
+
+def export_trace():
+    """Saves the timings recorded this session as a Chrome trace (chrome://tracing or Perfetto)."""
+    if not tracer.events:
+        messagebox.showinfo("Export Trace", "No timings recorded yet, enable Options > Record Timings first.")
+        return
+    path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome trace", "*.json")],
+                                        initialfile="headercommenter-trace.json")
+    if not path:
+        return
+    try:
+        tracer.export_chrome_trace(path)
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not export trace:\n{e}")
+
+def get_selected_paths():
+    """Returns the files of the tree view selection (directories count with all their files), or every file shown if nothing is selected."""
+    index = getattr(root, 'view_index', None)
+    if index is None:
+        return []
+    selection = file_tree.selection()
+    if not selection:
+        return [full_path for full_path, _ in index.iter_files()]
+    
+    paths = {}
+    for item in selection:
+        if item.startswith("d:"):
+            for full_path, _ in index.iter_files(item[2:]):
+                paths[full_path] = None
+        elif item.startswith("f:"):
+            paths[file_tree.item(item, "values")[0]] = None
+    return list(paths)
+
+def open_bulk_edit():
+    """Opens the bulk edit dialog on the selected files, or the whole tree if nothing is selected."""
+    paths = get_selected_paths()
+    if not paths:
+        messagebox.showwarning("Warning", "Open a directory first.")
+        return
+    BulkEditDialog(root, paths)
+
+def open_report():
+    """Opens the contribution report of the selected files, or the whole tree if nothing is selected."""
+    paths = get_selected_paths()
+    if not paths:
+        messagebox.showwarning("Warning", "Open a directory first.")
+        return
+    ReportDialog(root, paths)
+
+def open_history():
+    """Opens the undo history of header saves."""
+    HistoryDialog(root)
 
 # Dark Mode Colors
 BG_COLOR = "#1e1e1e"
@@ -489,78 +1628,167 @@ MENU_COLOR = "#333333"
 CURSOR_COLOR = "#ffffff"
 FONT = ("Consolas", 12)
 
-# Layout (Tree View + Text Editor)
-frame = tk.Frame(root)
-frame.pack(fill="both", expand=True)
-
-# File Tree (Left Panel)
-tree_frame = tk.Frame(frame, bg=BG_COLOR)
-tree_frame.pack(side="left", fill="y")
-
-file_tree = ttk.Treeview(tree_frame)
-file_tree.pack(fill="both", expand=True)
-file_tree.bind("<Double-1>", open_selected_file)
-
-# Text Editor Frame (Right Panel)
-editor_frame = tk.Frame(frame)
-editor_frame.pack(side="right", expand=True, fill="both")
-
-# Split editor frame into form and preview sections
-header_form_frame = tk.LabelFrame(editor_frame, text="Header Form", bg=BG_COLOR, fg=TEXT_COLOR)
-header_form_frame.pack(side="top", fill="x", padx=5, pady=5)
-
-header_form = HeaderForm(header_form_frame)
-header_form.pack(fill="x", padx=5, pady=5)
-
-header_preview_frame = tk.LabelFrame(editor_frame, text="Header Preview", bg=BG_COLOR, fg=TEXT_COLOR)
-header_preview_frame.pack(side="top", fill="x", padx=5, pady=5)
-
-header_text = tk.Text(header_preview_frame, height=15, wrap="word", font=FONT, 
-                     bg=BG_COLOR, fg=TEXT_COLOR, insertbackground=CURSOR_COLOR)
-header_text.pack(fill="x", padx=5, pady=5)
-
-# Code Area (Bottom)
-code_frame = tk.LabelFrame(editor_frame, text="Code", bg=BG_COLOR, fg=TEXT_COLOR)
-code_frame.pack(side="bottom", fill="both", expand=True, padx=5, pady=5)
-
-code_area = tk.Text(code_frame, wrap="word", font=FONT, bg=BG_COLOR, fg=TEXT_COLOR, 
-                   insertbackground=CURSOR_COLOR)
-code_area.pack(fill="both", expand=True, padx=5, pady=5)
-
-# Menu Bar
-menu = tk.Menu(root, bg=MENU_COLOR, fg=TEXT_COLOR, activebackground="#444", activeforeground="white")
-root.config(menu=menu)
-menu.add_command(label="Open Directory", command=lambda: open_directory(filedialog.askdirectory()))
-options_menu = Menu(menu, tearoff=0)
-menu.add_cascade(label="Options", menu=options_menu)
-menu.add_command(label="Save", command=save_file)
-menu.add_command(label="Quit", command=root.quit)
-
-# Add a toggle button for auto-saving
-def on_auto_save_toggle():
-    if auto_save_var.get():
-        root.bind('<Key>', save_file)
-    else:
-        root.bind('<Key>', lambda e: header_form.update_header_text())
+if __name__ == "__main__":
+    # Needed for the worker processes of the packaged executable
+    multiprocessing.freeze_support()
+    
+    # Parsed headers are cached on disk next to the config file
+    header_cache = HeaderCache(os.path.join(user_config_dir(), CACHE_FILE))
+
+    # Every header save is recorded there, so that it can be rolled back from the History window
+    journal = UndoJournal(os.path.join(user_config_dir(), JOURNAL_FILE))
+
+    # Auto save writes happen on a background thread
+    AUTOSAVE_POLL_MS = 250
+    autosave_writer = AutosaveWriter(autosave_write)
+
+    # GUI Setup
+    root = tk.Tk()
+    root.file_stats = {}  # filepath -> (mtime, size) as last loaded or written by the app
+    root.documents = DocumentCache(is_document_dirty)
+    root.tab_frames = {}  # filepath -> empty frame standing for its tab, in tab order
+    root.title("Header Commenter")
+    root.geometry("1000x800")
+
+    # Layout (Tree View + Text Editor)
+    frame = tk.Frame(root)
+    frame.pack(fill="both", expand=True)
+
+    # Status bar with the latest timings, only shown while timings are recorded
+    STATUS_TIMINGS = 4
+    STATUS_POLL_MS = 500
+    status_frame = tk.Frame(root, bg=MENU_COLOR)
+    status_label = tk.Label(status_frame, text="", bg=MENU_COLOR, fg=TEXT_COLOR, anchor="w")
+    status_label.pack(fill="x", padx=5)
+
+    # File Tree (Left Panel)
+    tree_frame = tk.Frame(frame, bg=BG_COLOR)
+    tree_frame.pack(side="left", fill="y")
+
+    # Directory scan progress, only shown while a scan is running
+    scan_frame = tk.Frame(tree_frame, bg=BG_COLOR)
+    scan_label = tk.Label(scan_frame, text="", bg=BG_COLOR, fg=TEXT_COLOR, anchor="w")
+    scan_label.pack(side="left", fill="x", expand=True)
+    tk.Button(scan_frame, text="Cancel", command=cancel_directory_scan,
+              bg=MENU_COLOR, fg=TEXT_COLOR).pack(side="right")
+
+    # Filter box narrowing the tree to the files whose header matches
+    filter_frame = tk.Frame(tree_frame, bg=BG_COLOR)
+    filter_frame.pack(side="top", fill="x")
+    filter_var = tk.StringVar()
+    filter_var.trace_add("write", schedule_filter)
+    filter_entry = tk.Entry(filter_frame, textvariable=filter_var, bg=MENU_COLOR, fg=TEXT_COLOR,
+                            insertbackground=CURSOR_COLOR)
+    filter_entry.pack(fill="x", padx=2, pady=2)
+    filter_status = tk.Label(filter_frame, text="", bg=BG_COLOR, fg=TEXT_COLOR, anchor="w")
+    filter_status.pack(fill="x")
+
+    file_tree = ttk.Treeview(tree_frame)
+    file_tree.pack(fill="both", expand=True)
+    file_tree.bind("<Double-1>", open_selected_file)
+    file_tree.bind("<<TreeviewOpen>>", on_tree_open)
+
+    # Text Editor Frame (Right Panel)
+    editor_frame = tk.Frame(frame)
+    editor_frame.pack(side="right", expand=True, fill="both")
+
+    # One tab per open file, switching between them shows the file without reading it again
+    tab_bar = ttk.Notebook(editor_frame, height=0)
+    tab_bar.pack(side="top", fill="x", padx=5)
+    tab_bar.enable_traversal()  # Ctrl+Tab and Ctrl+Shift+Tab
+    tab_bar.bind("<<NotebookTabChanged>>", on_tab_changed)
+    tab_bar.bind("<Button-2>", on_tab_middle_click)
+
+    # Split editor frame into form and preview sections
+    header_form_frame = tk.LabelFrame(editor_frame, text="Header Form", bg=BG_COLOR, fg=TEXT_COLOR)
+    header_form_frame.pack(side="top", fill="x", padx=5, pady=5)
+
+    header_form = HeaderForm(header_form_frame)
+    header_form.pack(fill="x", padx=5, pady=5)
+
+    header_preview_frame = tk.LabelFrame(editor_frame, text="Header Preview", bg=BG_COLOR, fg=TEXT_COLOR)
+    header_preview_frame.pack(side="top", fill="x", padx=5, pady=5)
+
+    header_text = tk.Text(header_preview_frame, height=15, wrap="word", font=FONT, 
+                         bg=BG_COLOR, fg=TEXT_COLOR, insertbackground=CURSOR_COLOR)
+    header_text.pack(fill="x", padx=5, pady=5)
+
+    # Code Area (Bottom)
+    code_frame = tk.LabelFrame(editor_frame, text="Code", bg=BG_COLOR, fg=TEXT_COLOR)
+    code_frame.pack(side="bottom", fill="both", expand=True, padx=5, pady=5)
+
+    # More code is loaded once the view gets this close to the end of what is loaded
+    CODE_PREFETCH_FRACTION = 0.9
+
+    code_scrollbar = tk.Scrollbar(code_frame)
+    code_scrollbar.pack(side="right", fill="y")
+    code_area = tk.Text(code_frame, wrap="word", font=FONT, bg=BG_COLOR, fg=TEXT_COLOR, 
+                       insertbackground=CURSOR_COLOR, yscrollcommand=on_code_scroll)
+    code_area.pack(fill="both", expand=True, padx=5, pady=5)
+    code_scrollbar.config(command=code_area.yview)
+
+    # Menu Bar
+    menu = tk.Menu(root, bg=MENU_COLOR, fg=TEXT_COLOR, activebackground="#444", activeforeground="white")
+    root.config(menu=menu)
+    menu.add_command(label="Open Directory", command=lambda: open_directory(filedialog.askdirectory()))
+    options_menu = Menu(menu, tearoff=0)
+    menu.add_cascade(label="Options", menu=options_menu)
+    menu.add_command(label="Save", command=save_file)
+    menu.add_command(label="Bulk Edit", command=open_bulk_edit)
+    menu.add_command(label="Report", command=open_report)
+    menu.add_command(label="History", command=open_history)
+    menu.add_command(label="Quit", command=quit_app)
+
+    # Add a toggle button for auto-saving
+    def on_auto_save_toggle():
+        # Every key schedules a preview update, which also feeds the autosave writer when enabled
+        root.bind('<Key>', schedule_header_update)
+        if auto_save_var.get():
+            schedule_header_update()
+
+    auto_save_var = tk.BooleanVar(value=False)
+    options_menu.add_checkbutton(label="Auto Save", onvalue=True, offvalue=False,
+                                 variable=auto_save_var, command=on_auto_save_toggle)
+
+    # Header only mode never reads the code of a file
+    header_only_var = tk.BooleanVar(value=False)
+    options_menu.add_checkbutton(label="Header Only", onvalue=True, offvalue=False,
+                                 variable=header_only_var, command=on_header_only_toggle)
+
+    # Timing spans of the hot paths, exportable as a Chrome trace
+    record_timings_var = tk.BooleanVar(value=False)
+    options_menu.add_checkbutton(label="Record Timings", onvalue=True, offvalue=False,
+                                 variable=record_timings_var, command=on_record_timings_toggle)
+    options_menu.add_command(label="Export Trace...", command=export_trace)
+
+    # Bind Ctrl+Q to quit
+    root.bind('<Control-q>', quit_app)
+    root.protocol("WM_DELETE_WINDOW", quit_app)
+
+    # Bind Ctrl+O to open file
+    root.bind('<Control-o>', lambda e: open_file(filedialog.askopenfilename))
+
+    # Bind Ctrl+S to save
+    root.bind('<Control-s>', save_file)
 
-auto_save_var = tk.BooleanVar(value=False)
-options_menu.add_checkbutton(label="Auto Save", onvalue=True, offvalue=False,
-                             variable=auto_save_var, command=on_auto_save_toggle)
+    # Bind Ctrl+W to close the open file
+    root.bind('<Control-w>', lambda e: close_tab())
 
-# Bind Ctrl+Q to quit
-root.bind('<Control-q>', lambda e: root.quit())
+    # Bind Ctrl+F to the tree filter
+    root.bind('<Control-f>', lambda e: filter_entry.focus_set())
 
-# Bind Ctrl+O to open file
-root.bind('<Control-o>', lambda e: open_file(filedialog.askopenfilename))
+    # Bind all key presses to update header preview
+    on_auto_save_toggle()
 
-# Bind Ctrl+S to save
-root.bind('<Control-s>', save_file)
+    # try to open the last opened directory
+    # (once the window is up, so that it shows right away)
+    root.after_idle(open_last_opened_directory)
 
-# Bind all key presses to update header preview
-on_auto_save_toggle()
+    # Report autosave errors
+    poll_autosave_errors()
 
-# try to open the last opened directory
-open_last_opened_directory()
+    # Run the Application
+    root.mainloop()
 
-# Run the Application
-root.mainloop()
\ No newline at end of file
+    # Write the edits the autosave thread has not written yet
+    autosave_writer.flush()
@@ -0,0 +1,70 @@
+import mmap
+import os
+from header_core import COPYRIGHT_MARKER, locate_header
+
+# How much of the code is read at a time
+CODE_PAGE_LINES = 200
+CODE_PAGE_BYTES = 256 * 1024
+
+class FileWindow:
+    """Pages through the code of a file (everything after its header) a few lines at a time.
+
+    Every page maps the file, copies out the next lines and unmaps it again.
+    No handle stays open between pages, so the file can still be saved and
+    replaced while it is shown. The header is located again for every page,
+    which keeps the position right when the header changed size in between.
+    end_marker is the text on the last line of the header format in use."""
+    def __init__(self, filepath, page_lines=CODE_PAGE_LINES, page_bytes=CODE_PAGE_BYTES, end_marker=COPYRIGHT_MARKER):
+        self.filepath = filepath
+        self.end_marker = end_marker
+        self.page_lines = page_lines
+        self.page_bytes = page_bytes
+        self.consumed = None  # Bytes of the body already read, None before the first page
+        self.exhausted = False
+
+    def read_page(self):
+        """Returns the next lines of code as text, or "" once the end of the file is reached."""
+        if self.exhausted:
+            return ""
+
+        with open(self.filepath, "rb") as file:
+            location = locate_header(file, end_marker=self.end_marker)
+            size = os.fstat(file.fileno()).st_size
+            if size <= location.end:
+                self.exhausted = True
+                return ""
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if self.consumed is None:
+                    # Skip the blank lines between the header and the code
+                    i = location.end
+                    self.consumed = 0
+                    while i < size and view[i] in b" \t\r\n":
+                        i += 1
+                        if view[i - 1] == ord("\n"):
+                            self.consumed = i - location.end
+
+                start = location.end + self.consumed
+                limit = min(size, start + self.page_bytes)
+                end = start
+                for _ in range(self.page_lines):
+                    newline = view.find(b"\n", end, limit)
+                    if newline == -1:
+                        end = limit
+                        break
+                    end = newline + 1
+
+                # A page cut in the middle of a long line must not split a UTF-8 character
+                # (nor a CRLF line break)
+                if end < size and end == limit:
+                    while end > start and view[end] & 0xC0 == 0x80:
+                        end -= 1
+                    if end > start + 1 and view[end - 1] == ord("\r"):
+                        end -= 1
+
+                data = view[start:end]
+
+        self.consumed += len(data)
+        if start + len(data) >= size:
+            self.exhausted = True
+        return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
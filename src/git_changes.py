@@ -0,0 +1,74 @@
+import os
+import subprocess
+from header_core import CPP_EXTENSIONS
+from walker import IgnoreTree
+
+# Index (X) states of a staged file worth checking, deletions are left out
+STAGED_STATES = "AMRC"
+
+class GitError(Exception):
+    """Raised when git is missing or the directory is not in a git work tree."""
+
+def run_git(directory, *args):
+    """Runs a local git command in directory and returns its output."""
+    try:
+        result = subprocess.run(["git", "-C", directory, *args], capture_output=True, check=False)
+    except OSError as e:
+        raise GitError(f"could not run git: {e}") from e
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed")
+    return result.stdout
+
+def git_root(directory):
+    """Returns the top level directory of the work tree containing directory."""
+    return os.fsdecode(run_git(directory, "rev-parse", "--show-toplevel").rstrip(b"\n"))
+
+def parse_status(output, staged_only=False):
+    """Returns the paths of `git status --porcelain -z` output that were added or modified.
+
+    Without staged_only, changes in the work tree and untracked files count too."""
+    entries = output.split(b"\0")
+    paths = []
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        i += 1
+        if len(entry) < 4:
+            continue
+        index_state, tree_state = chr(entry[0]), chr(entry[1])
+        if index_state in "RC":
+            i += 1  # The original path of a rename or copy follows
+        if index_state in STAGED_STATES or (not staged_only and tree_state in "M?"):
+            paths.append(os.fsdecode(entry[3:]))
+    return paths
+
+def changed_files(directory, staged_only=False, since=None):
+    """Returns the C++ files under directory that git reports as changed, sorted.
+
+    By default these are the files staged, modified in the work tree or
+    untracked. Files the ignore files exclude are left out, the same ones
+    walking the directory leaves out. staged_only limits them to the staged
+    files, since to the files that differ between a commit and the work tree.
+    Only the local repository is read. Raises GitError outside a work tree."""
+    root = git_root(directory)
+    if since is not None:
+        output = run_git(root, "diff", "--name-only", "-z", "--no-renames", "--diff-filter=ACMR", since, "--")
+        paths = [os.fsdecode(path) for path in output.split(b"\0") if path]
+    else:
+        output = run_git(root, "status", "--porcelain", "-z", "--untracked-files=all")
+        paths = parse_status(output, staged_only)
+
+    directory = os.path.realpath(directory)
+    prefix = os.path.join(directory, "")
+    ignore_tree = IgnoreTree(directory)
+    files = set()
+    for rel_path in paths:
+        if os.path.splitext(rel_path)[1].lower() not in CPP_EXTENSIONS:
+            continue
+        full_path = os.path.join(root, rel_path.replace("/", os.sep))
+        real_path = os.path.realpath(full_path)
+        if not real_path.startswith(prefix) or not os.path.isfile(full_path):
+            continue
+        if not ignore_tree.is_ignored(real_path[len(prefix):].replace(os.sep, "/")):
+            files.add(full_path)
+    return sorted(files)
@@ -0,0 +1,115 @@
+import json
+import os
+import sqlite3
+import threading
+from header_core import Header, HeaderLocation, read_header
+from header_template import DEFAULT_FORMAT
+from tracing import tracer
+
+# The app keeps it in the per-user config directory, next to the session snapshots
+CACHE_FILE = "headercommenter-cache.db"
+
+# Bump when the stored data changes shape or a parser changes its results, old caches are then rebuilt
+SCHEMA_VERSION = 5
+
+class HeaderCache:
+    """Persistent cache of the parsed header of each file, keyed by path and validated by mtime, size and
+    the key of the header format it was parsed with.
+
+    The cache is a SQLite database in WAL mode, so several app instances can
+    read and write it at the same time. Every thread gets its own connection.
+    Any database error makes the cache behave as if it were empty."""
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        """Returns the connection of the calling thread, opening the database on first use."""
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            # Autocommit, every statement is its own short transaction
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            try:
+                self.create_schema(connection)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self.local.connection = connection
+        return connection
+
+    def create_schema(self, connection):
+        """Sets up a fresh connection, (re)creating the table if the cache is missing or outdated."""
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        # Checked inside the write transaction so that two instances never both rebuild it
+        connection.execute("BEGIN IMMEDIATE")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            connection.execute("DROP TABLE IF EXISTS headers")
+            connection.execute("""CREATE TABLE headers (
+                                      path TEXT PRIMARY KEY,
+                                      mtime_ns INTEGER NOT NULL,
+                                      size INTEGER NOT NULL,
+                                      header_start INTEGER NOT NULL,
+                                      header_end INTEGER NOT NULL,
+                                      newline TEXT NOT NULL,
+                                      text TEXT NOT NULL,
+                                      fields TEXT NOT NULL,
+                                      format TEXT NOT NULL)""")
+            connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        connection.execute("COMMIT")
+
+    def get(self, filepath, stat, format_key=DEFAULT_FORMAT.key):
+        """Returns the cached (HeaderLocation, Header) of a file if it is still valid for stat, else None."""
+        try:
+            row = self.connection().execute(
+                "SELECT header_start, header_end, newline, text, fields FROM headers "
+                "WHERE path = ? AND mtime_ns = ? AND size = ? AND format = ?",
+                (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, format_key)).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        start, end, newline, text, fields = row
+        return HeaderLocation(text, start, end, newline), Header.from_dict(json.loads(fields))
+
+    def put(self, filepath, stat, location, header, format_key=DEFAULT_FORMAT.key):
+        """Stores the header of a file as it was when stat was taken."""
+        try:
+            self.connection().execute(
+                "INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, location.start, location.end,
+                 location.newline, location.text, json.dumps(header.to_dict()), format_key))
+        except sqlite3.Error:
+            pass
+
+    def forget(self, filepath):
+        """Drops the entry of a file."""
+        try:
+            self.connection().execute("DELETE FROM headers WHERE path = ?", (os.path.abspath(filepath),))
+        except sqlite3.Error:
+            pass
+
+    def read_header(self, filepath, header_format=DEFAULT_FORMAT):
+        """Returns (HeaderLocation, Header) of a file, from the cache when the file did not change."""
+        stat = os.stat(filepath)
+        cached = self.get(filepath, stat, header_format.key)
+        if cached is not None:
+            return cached
+
+        # Timed apart, so that reading and decoding the file can be told from parsing it
+        with tracer.span("read_header"):
+            location = read_header(filepath, end_marker=header_format.end_marker)
+        with tracer.span("parse_header"):
+            header = header_format.parse(location.text, span=(location.start, location.end))
+
+        # Only cache what was read if the file did not change in the meantime
+        if os.stat(filepath).st_mtime_ns == stat.st_mtime_ns:
+            self.put(filepath, stat, location, header, header_format.key)
+        return location, header
+
+    def close(self):
+        """Closes the connection of the calling thread."""
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
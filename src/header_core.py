@@ -0,0 +1,436 @@
+import errno
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime
+
+# Allowed C++ file extensions
+CPP_EXTENSIONS = {".h", ".hpp", ".c", ".cpp", ".inl"}
+
+# The line that marks the end of a header comment
+COPYRIGHT_MARKER = "Copyright (c)"
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+# Files whose header does not end within these budgets are treated as having no header
+HEADER_MAX_LINES = 200
+HEADER_MAX_BYTES = 64 * 1024
+
+class ParseError:
+    """A header line the parser could not make sense of, with its 1-based line number."""
+    __slots__ = ("line", "message")
+
+    def __init__(self, line, message):
+        self.line = line
+        self.message = message
+
+    def __eq__(self, other):
+        return isinstance(other, ParseError) and (self.line, self.message) == (other.line, other.message)
+
+    def __repr__(self):
+        return f"ParseError({self.line}, {self.message!r})"
+
+    def __str__(self):
+        return f"line {self.line}: {self.message}"
+
+class Author:
+    """A single author entry of a header: contribution percent, name, email and bullet points."""
+    __slots__ = ("percent", "name", "email", "points")
+
+    def __init__(self, percent="", name="", email="", points=None):
+        self.percent = percent
+        self.name = name
+        self.email = email
+        self.points = points if points is not None else []
+
+    def __eq__(self, other):
+        return (isinstance(other, Author) and
+                (self.percent, self.name, self.email, self.points) ==
+                (other.percent, other.name, other.email, other.points))
+
+    def to_dict(self):
+        return {"percent": self.percent, "name": self.name, "email": self.email, "points": list(self.points)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["percent"], data["name"], data["email"], list(data["points"]))
+
+    def __repr__(self):
+        return f"Author({self.percent!r}, {self.name!r}, {self.email!r}, {self.points!r})"
+
+class Header:
+    """The fields of a file header, independent of any widgets.
+
+    Fields that were not found in the parsed text are left as None (team, website,
+    filename, year) or empty (description, authors). span is the (start, end)
+    byte range of the header in its file when known, errors lists the
+    ParseErrors of the lines that could not be parsed."""
+    __slots__ = ("team", "website", "filename", "description", "authors", "year", "span", "errors")
+
+    def __init__(self, team=None, website=None, filename=None, description="", authors=None, year=None,
+                 span=None, errors=None):
+        self.team = team
+        self.website = website
+        self.filename = filename
+        self.description = description
+        self.authors = authors if authors is not None else []
+        self.year = year
+        self.span = span
+        self.errors = errors if errors is not None else []
+
+    def __eq__(self, other):
+        return (isinstance(other, Header) and
+                (self.team, self.website, self.filename, self.description, self.authors, self.year) ==
+                (other.team, other.website, other.filename, other.description, other.authors, other.year))
+
+    def to_dict(self):
+        """Returns the header as plain JSON-compatible data."""
+        return {"team": self.team, "website": self.website, "filename": self.filename,
+                "description": self.description, "authors": [author.to_dict() for author in self.authors],
+                "year": self.year, "span": list(self.span) if self.span is not None else None,
+                "errors": [[error.line, error.message] for error in self.errors]}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a header from the data returned by to_dict."""
+        span = data.get("span")
+        return cls(data["team"], data["website"], data["filename"], data["description"],
+                   [Author.from_dict(author) for author in data["authors"]], data["year"],
+                   tuple(span) if span is not None else None,
+                   [ParseError(line, message) for line, message in data.get("errors", [])])
+
+    def __repr__(self):
+        return (f"Header(team={self.team!r}, website={self.website!r}, filename={self.filename!r}, "
+                f"description={self.description!r}, authors={self.authors!r}, year={self.year!r})")
+
+class HeaderLocation:
+    """Where the header comment of a file is.
+
+    text is the decoded header without its final line break, start and end are
+    the byte offsets of the header in the file (the line break after the
+    copyright line belongs to the body) and newline is the file's line ending.
+    A file without a header has an empty text and start == end."""
+    __slots__ = ("text", "start", "end", "newline")
+
+    def __init__(self, text="", start=0, end=0, newline="\n"):
+        self.text = text
+        self.start = start
+        self.end = end
+        self.newline = newline
+
+    def __repr__(self):
+        return f"HeaderLocation({self.text!r}, {self.start}, {self.end}, {self.newline!r})"
+
+def locate_header(file, max_lines=HEADER_MAX_LINES, max_bytes=HEADER_MAX_BYTES, end_marker=COPYRIGHT_MARKER):
+    """Finds the header comment at the top of a binary file by streaming its lines.
+
+    The header ends with the first line containing end_marker (the copyright
+    line of the default format). Reading stops at that line, at the first line that is not a "//"
+    comment, or once max_lines lines or max_bytes bytes have been read, so the
+    cost depends on the size of the header and not on the size of the file."""
+    offset = 0
+    start = None
+    newline = None
+    lines = []
+    marker = end_marker.encode("utf-8")
+
+    # Skip the byte order mark, it is not part of the header
+    bom = file.read(len(UTF8_BOM))
+    if bom == UTF8_BOM:
+        offset = len(UTF8_BOM)
+    else:
+        file.seek(0)
+
+    for _ in range(max_lines):
+        if offset >= max_bytes:
+            break
+        line = file.readline(max_bytes - offset)
+        if not line:
+            break
+        if newline is None and line.endswith(b"\n"):
+            newline = "\r\n" if line.endswith(b"\r\n") else "\n"
+
+        stripped = line.strip()
+        if stripped.startswith(b"//"):
+            if start is None:
+                start = offset
+            lines.append(line)
+            if marker in line:
+                content = line.rstrip(b"\r\n")
+                end = offset + len(content)
+                lines[-1] = content
+                text = b"".join(lines).decode("utf-8", errors="replace").replace("\r\n", "\n")
+                return HeaderLocation(text, start, end, newline or "\n")
+        elif stripped or start is not None:
+            # Only blank lines may come before the header, anything else ends the search
+            break
+        offset += len(line)
+
+    # No header, a new one would be inserted after the byte order mark
+    insert_at = len(UTF8_BOM) if bom == UTF8_BOM else 0
+    return HeaderLocation("", insert_at, insert_at, newline or "\n")
+
+def read_header(filepath, max_lines=HEADER_MAX_LINES, max_bytes=HEADER_MAX_BYTES, end_marker=COPYRIGHT_MARKER):
+    """Opens a file and locates its header comment."""
+    with open(filepath, "rb") as file:
+        return locate_header(file, max_lines, max_bytes, end_marker)
+
+def _copy_range(source, destination, offset):
+    """Copies source from offset to its end onto destination, in the kernel when the platform allows it."""
+    source.flush()
+    destination.flush()
+    src_fd = source.fileno()
+    dst_fd = destination.fileno()
+    remaining = os.fstat(src_fd).st_size - offset
+
+    if remaining > 0 and hasattr(os, "copy_file_range"):
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd, dst_fd, remaining, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            pass  # Not supported between these file systems, fall back below
+
+    if remaining > 0 and hasattr(os, "sendfile"):
+        try:
+            while remaining > 0:
+                copied = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if copied == 0:
+                    break
+                offset += copied
+                remaining -= copied
+        except OSError:
+            pass
+
+    if remaining > 0:
+        # Plain copy through user space
+        source.seek(offset)
+        destination.seek(0, os.SEEK_END)
+        shutil.copyfileobj(source, destination)
+
+def write_header(filepath, header, end_marker=COPYRIGHT_MARKER):
+    """Replaces the header of a file with the given header text and returns the text it replaced.
+
+    Only the header is encoded, everything before and after it (byte order
+    mark, line endings, the whole body) is copied byte for byte. The result is
+    written to a temporary file next to the original and renamed over it, so
+    an interrupted save never leaves a truncated file behind. Symbolic links
+    are followed and a file with several hard links is written in place, so
+    that every name sees the new header. Read-only files raise PermissionError.
+    A file without a header gets the header inserted at the top, followed by
+    a blank line, and "" is returned."""
+    return _rewrite_header(filepath, header, end_marker)
+
+def remove_header(filepath, end_marker=COPYRIGHT_MARKER):
+    """Removes the header of a file, with the blank line write_header() puts after an inserted one.
+
+    Returns the removed header text, "" if the file has no header."""
+    return _rewrite_header(filepath, None, end_marker)
+
+def _rewrite_header(filepath, header, end_marker):
+    """Replaces the header of a file with header, or removes it if header is None."""
+    filepath = os.path.realpath(filepath)
+    if not os.access(filepath, os.W_OK):
+        raise PermissionError(errno.EACCES, "the file is read-only", filepath)
+    directory = os.path.dirname(filepath)
+    with open(filepath, "rb") as source:
+        location = locate_header(source, end_marker=end_marker)
+        end = location.end
+        if header is None:
+            if not location.text:
+                return ""
+            header_bytes = b""
+            # The line break ending the header and the blank line after it go too
+            gap = (location.newline * 2).encode()
+            source.seek(end)
+            if source.read(len(gap)) == gap:
+                end += len(gap)
+        else:
+            header_bytes = header.replace("\n", location.newline).encode("utf-8")
+            if not location.text:
+                header_bytes += (location.newline * 2).encode()
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(filepath) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as destination:
+                source.seek(0)
+                destination.write(source.read(location.start))
+                destination.write(header_bytes)
+                _copy_range(source, destination, end)
+                destination.flush()
+                os.fsync(destination.fileno())
+            shutil.copymode(filepath, temp_path)
+            hard_linked = os.fstat(source.fileno()).st_nlink > 1
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    if hard_linked:
+        # Renaming would give this name a new file and leave the other links with the old one
+        try:
+            with open(temp_path, "rb") as new, open(filepath, "r+b") as target:
+                shutil.copyfileobj(new, target)
+                target.truncate()
+                target.flush()
+                os.fsync(target.fileno())
+        finally:
+            os.remove(temp_path)
+    else:
+        os.replace(temp_path, filepath)
+    return location.text
+
+# Patterns of the header lines, matched against the text after "//"
+TEAM_PATTERN = re.compile(r"(?P<team>[^\[]*?)\s*\[(?P<website>[^\]]*)\]")
+# The email is the first parenthesized group with an "@", or else the last one, so names may contain
+# parentheses themselves. Text after the email is ignored, as the editor always did.
+AUTHOR_PATTERN = re.compile(r"\[\s*(?P<percent>[^\]]*?)\s*%?\s*\]\s*(?P<name>.*?)\s*"
+                            r"\((?P<email>[^()]*@[^()]*|[^()]*(?=\)\s*$))\)")
+COPYRIGHT_PATTERN = re.compile(re.escape(COPYRIGHT_MARKER) + r"\s*(?P<year>\d+)?")
+
+# Parser states, in the order the sections appear in a header
+_STATE_TITLE = 0        # Team line and file name
+_STATE_DESCRIPTION = 1
+_STATE_AUTHORS = 2
+
+def parse_header(header, span=None):
+    """Parses a header comment into a Header in a single pass over its lines.
+
+    Lines that do not fit the format are skipped and reported in the
+    header's errors instead of stopping the parse."""
+    result = Header(span=span)
+    errors = result.errors
+    description_lines = []
+    authors = result.authors
+    current_author = None
+    state = _STATE_TITLE
+
+    for number, line in enumerate(header.split('\n'), 1):
+        line = line.strip()
+        if not line.startswith('//'):
+            if line:
+                errors.append(ParseError(number, "Not a // comment line"))
+            continue
+        content = line[2:].strip()
+
+        if state == _STATE_TITLE:
+            if not content:
+                # First empty line after file name, start collecting description
+                state = _STATE_DESCRIPTION
+            elif result.team is None and not content.startswith('['):
+                match = TEAM_PATTERN.match(content)
+                if match is not None:
+                    result.team = match.group("team")
+                    result.website = match.group("website").strip()
+                elif result.filename is None:
+                    result.filename = content
+            elif result.filename is None:
+                result.filename = content
+            else:
+                errors.append(ParseError(number, "Unexpected line before the description"))
+            continue
+
+        if state == _STATE_DESCRIPTION:
+            # Stop collecting description when we hit AUTHORS
+            if content == "AUTHORS":
+                state = _STATE_AUTHORS
+                if description_lines and description_lines[-1] == "":
+                    description_lines.pop()  # Remove extra empty line
+            else:
+                # Collect description lines including empty lines and preserve indentation
+                description_lines.append(line[3:] if line.startswith('// ') else line[2:])
+            continue
+
+        if not content:
+            continue
+        first = content[0]
+        if first == '[':
+            match = AUTHOR_PATTERN.match(content)
+            if match is None:
+                errors.append(ParseError(number, "Malformed author line"))
+                current_author = None
+                continue
+            # The email is stored without its "\@domain" part
+            email = match.group("email").split('@')[0].replace('\\', '').strip()
+            current_author = Author(match.group("percent"), match.group("name"), email)
+            authors.append(current_author)
+        elif first == '-':
+            if current_author is None:
+                errors.append(ParseError(number, "Contribution point without an author"))
+            else:
+                current_author.points.append(content[1:].strip())
+        elif content.startswith(COPYRIGHT_MARKER):
+            year = COPYRIGHT_PATTERN.match(content).group("year")
+            if year is not None:
+                result.year = int(year)
+        else:
+            errors.append(ParseError(number, "Unexpected line in the authors section"))
+
+    result.description = '\n'.join(description_lines)
+    return result
+
+def wrap_description(text, width=80):
+    """Wraps each line of a description at the given width, keeping each line's indentation."""
+    wrapped_lines = []
+
+    # Parse by line
+    for line in text.split('\n'):
+        # Split line into words
+        words = line.split()
+        current_line = ""
+
+        # Get the characters before the first non-space character
+        prefix = line[:len(line) - len(line.lstrip())]
+
+        for word in words:
+            # Check if adding the word will exceed the width limit
+            if len(current_line) + len(word) + 1 <= width:
+                current_line += word + " "
+            else:
+                # Add back the prefix, without the last space
+                wrapped_lines.append((prefix + current_line).rstrip())
+                current_line = word + " "
+
+        # Add the last line, no line keeps trailing spaces so that parsing and rendering again gives the same text
+        wrapped_lines.append((prefix + current_line).rstrip())
+
+    return wrapped_lines
+
+def render_header(header, filename=None, year=None):
+    """Renders a Header as a header comment, without a trailing line break.
+
+    filename and year default to the ones stored in the header, then to
+    "filename.ext" and the current year."""
+    if filename is None:
+        filename = header.filename if header.filename is not None else "filename.ext"
+    if year is None:
+        year = header.year if header.year is not None else datetime.now().year
+
+    # Build header comment
+    lines = [f"// {header.team or ''} [{header.website or ''}]",
+             f"// {filename}",
+             "//"]
+
+    # Add description (wrap at 80 chars)
+    for line in wrap_description(header.description):
+        lines.append("// " + line)
+
+    lines.append("//")
+
+    # Add authors
+    lines.append("// AUTHORS")
+    for author in header.authors:
+        lines.append(f"// [{author.percent.strip()}%] {author.name.strip()} ({author.email.strip()}\\@digipen.edu)")
+
+        # Add contribution points
+        for point in author.points:
+            point = point.strip()
+            if point:  # Only add non-empty points
+                lines.append(f"//   - {point}")
+
+    lines.append("//")
+    lines.append(f"// Copyright (c) {year} DigiPen, All rights reserved.")
+    return '\n'.join(lines)
@@ -0,0 +1,238 @@
+import bisect
+import queue
+import re
+import threading
+import time
+
+# Fields a search term can be limited to with "field:term", file names are matched by substring
+INDEX_FIELDS = ("team", "website", "author", "email", "year")
+FILE_FIELD = "file"
+
+# Properties matched with "is:flag"
+FLAG_MISSING = "missing"        # No header at all
+FLAG_NO_DESCRIPTION = "nodesc"  # Header without a description
+FLAG_NO_AUTHORS = "noauthors"   # Header without authors
+FLAG_BAD_PERCENT = "badpercent" # Author percentages that are not numbers or do not add up to 100
+FLAG_ERRORS = "errors"          # Header lines the parser could not make sense of
+INDEX_FLAGS = (FLAG_MISSING, FLAG_NO_DESCRIPTION, FLAG_NO_AUTHORS, FLAG_BAD_PERCENT, FLAG_ERRORS)
+
+# Files read by the background build before its results are handed over
+INDEX_BATCH_SIZE = 200
+INDEX_BATCH_SECONDS = 0.05
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+QUERY_TERM_PATTERN = re.compile(r'(-?)(?:(\w+):)?("[^"]*"?|\S+)')
+
+def tokenize(text):
+    """Splits text into the lowercase words it is indexed under."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def header_flags(header):
+    """Returns the flags of a parsed Header, or of a missing header for None."""
+    if header is None:
+        return {FLAG_MISSING}
+    flags = set()
+    if not header.description.strip():
+        flags.add(FLAG_NO_DESCRIPTION)
+    if not header.authors:
+        flags.add(FLAG_NO_AUTHORS)
+    else:
+        try:
+            total = sum(float(author.percent) for author in header.authors)
+            if abs(total - 100) > 0.5:
+                flags.add(FLAG_BAD_PERCENT)
+        except ValueError:
+            flags.add(FLAG_BAD_PERCENT)
+    if header.errors:
+        flags.add(FLAG_ERRORS)
+    return flags
+
+def header_tokens(header):
+    """Returns the (field, token) pairs a file is indexed under."""
+    tokens = set()
+    if header is None:
+        return tokens
+    for field, value in (("team", header.team), ("website", header.website)):
+        if value:
+            tokens.update((field, token) for token in tokenize(value))
+    if header.year is not None:
+        tokens.add(("year", str(header.year)))
+    for author in header.authors:
+        tokens.update(("author", token) for token in tokenize(author.name))
+        tokens.update(("email", token) for token in tokenize(author.email))
+    return tokens
+
+def index_entry(header):
+    """Returns what a file with a parsed Header (or None) is indexed under, as taken by HeaderIndex.add_entry()."""
+    return header_tokens(header), header_flags(header)
+
+class HeaderIndex:
+    """In-memory inverted index from header fields to the files of a directory.
+
+    Every file gets an integer id, each field maps its tokens to the set of
+    ids of the files using them, and each flag maps to its set of ids. A
+    query term is a prefix looked up with bisect in the sorted tokens of a
+    field, so a search touches the matching postings only. File names are
+    too many distinct words to index and are scanned instead. Files are
+    added and removed one at a time, so the index can be filled in the
+    background and kept up to date as headers are saved."""
+    def __init__(self):
+        self.paths = []  # id -> relative path, None once removed
+        self.names = []  # id -> lowercase file name, "" once removed
+        self.ids = {}    # relative path -> id
+        self.entries = {}  # id -> (tokens, flags) the file is indexed under
+        self.postings = {field: {} for field in INDEX_FIELDS}
+        self.sorted_tokens = {}  # field -> sorted tokens, rebuilt after the field got new tokens
+        self.flags = {flag: set() for flag in INDEX_FLAGS}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, rel_path, header):
+        """Indexes (or re-indexes) a file under its parsed Header, None for a file without header."""
+        self.add_entry(rel_path, *index_entry(header))
+
+    def add_entry(self, rel_path, tokens, flags):
+        """Indexes (or re-indexes) a file under the tokens and flags from index_entry()."""
+        file_id = self.ids.get(rel_path)
+        if file_id is None:
+            file_id = len(self.paths)
+            self.paths.append(rel_path)
+            self.names.append(rel_path.rsplit("/", 1)[-1].lower())
+            self.ids[rel_path] = file_id
+        else:
+            self._unlink(file_id)
+
+        for field, token in tokens:
+            postings = self.postings[field]
+            ids = postings.get(token)
+            if ids is None:
+                postings[token] = ids = set()
+                self.sorted_tokens.pop(field, None)
+            ids.add(file_id)
+        for flag in flags:
+            self.flags[flag].add(file_id)
+        self.entries[file_id] = (tokens, flags)
+
+    def remove(self, rel_path):
+        """Drops a file from the index."""
+        file_id = self.ids.pop(rel_path, None)
+        if file_id is None:
+            return
+        self._unlink(file_id)
+        del self.entries[file_id]
+        self.paths[file_id] = None
+        self.names[file_id] = ""
+
+    def _unlink(self, file_id):
+        tokens, flags = self.entries[file_id]
+        for field, token in tokens:
+            postings = self.postings[field]
+            ids = postings[token]
+            ids.discard(file_id)
+            if not ids:
+                del postings[token]
+                self.sorted_tokens.pop(field, None)
+        for flag in flags:
+            self.flags[flag].discard(file_id)
+
+    def _prefix_ids(self, field, prefix):
+        """Returns the ids of the files with a token of field starting with prefix."""
+        tokens = self.sorted_tokens.get(field)
+        if tokens is None:
+            tokens = self.sorted_tokens[field] = sorted(self.postings[field])
+        postings = self.postings[field]
+        result = set()
+        i = bisect.bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            result |= postings[tokens[i]]
+            i += 1
+        return result
+
+    def _term_ids(self, field, value):
+        if field == "is":
+            if value not in self.flags:
+                raise ValueError(f"unknown flag is:{value}, use one of {', '.join(INDEX_FLAGS)}")
+            return set(self.flags[value])
+        if field == FILE_FIELD:
+            return {file_id for file_id, name in enumerate(self.names) if value in name}
+        if field is not None and field not in self.postings:
+            raise ValueError(f"unknown field {field}:, use one of {FILE_FIELD}, {', '.join(INDEX_FIELDS)} or is:")
+
+        # Every word of the value has to match, "Full Name" finds both words
+        result = None
+        for word in tokenize(value) or [value.lower()]:
+            fields = [field] if field is not None else INDEX_FIELDS
+            ids = set()
+            for name in fields:
+                ids |= self._prefix_ids(name, word)
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        if field is None:
+            result |= self._term_ids(FILE_FIELD, value)
+        return result
+
+    def search(self, query):
+        """Returns the sorted relative paths of the files matching every term of query.
+
+        Terms are word prefixes searched in all fields and substrings of the
+        file name, or only in one field with field:term (author:"full name"
+        for several words, file:name for the file name). is:flag matches
+        the files with a flag and a leading - excludes the matches of a
+        term. Raises ValueError for unknown fields and flags."""
+        included = None
+        excluded = set()
+        for negate, field, value in QUERY_TERM_PATTERN.findall(query):
+            value = value.strip('"')
+            if not value:
+                continue
+            field = field.lower() or None
+            ids = self._term_ids(field, value.lower())
+            if negate:
+                excluded |= ids
+            else:
+                included = ids if included is None else included & ids
+        if included is None:
+            included = set(self.ids.values())
+        return sorted(self.paths[file_id] for file_id in included - excluded)
+
+class IndexBuild:
+    """Reads the headers of files on a worker thread and hands them to the Tk main thread in batches.
+
+    read(full_path) returns a file's parsed Header or None if it has none.
+    The queue receives lists of (relative path, tokens, flags) for
+    HeaderIndex.add_entry(), then None once every file was read."""
+    def __init__(self, files, read):
+        self.files = files  # (full path, relative path)
+        self.read = read
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.done_count = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            for full_path, rel_path in self.files:
+                if self.cancelled.is_set():
+                    return
+                try:
+                    header = self.read(full_path)
+                except (OSError, UnicodeDecodeError):
+                    continue  # Unreadable files are left out of the index
+                batch.append((rel_path, *index_entry(header)))
+                if len(batch) >= INDEX_BATCH_SIZE or time.monotonic() - last_flush >= INDEX_BATCH_SECONDS:
+                    self.queue.put(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+            self.queue.put(batch)
+        finally:
+            self.queue.put(None)
@@ -0,0 +1,323 @@
+import functools
+import hashlib
+import os
+import re
+from datetime import datetime
+from header_core import (COPYRIGHT_MARKER, Author, Header, ParseError, parse_header, render_header,
+                         wrap_description)
+
+# Looked up at the root of an opened directory
+TEMPLATE_FILE_NAME = ".headercommenter-template"
+
+# Fields of a single line, a description line and an author line with its points
+LINE_FIELDS = {"team", "website", "filename", "year"}
+AUTHOR_FIELDS = {"percent", "name", "email"}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+# Fields directly after an opening bracket and before the closing one never contain these brackets
+BRACKETS = {"(": ")", "[": "]", "{": "}", "<": ">"}
+
+class TemplateError(ValueError):
+    """Raised for templates that cannot be compiled."""
+
+class BuiltinFormat:
+    """The default DigiPen format, handled by the hand-written parser and renderer of header_core."""
+    key = "builtin"
+    end_marker = COPYRIGHT_MARKER
+
+    def render(self, header, filename=None, year=None):
+        return render_header(header, filename, year)
+
+    def parse(self, text, span=None):
+        return parse_header(text, span)
+
+DEFAULT_FORMAT = BuiltinFormat()
+
+def _split_line(line, number):
+    """Splits a template line into literal strings and field names (as 1-tuples)."""
+    pieces = []
+    last = 0
+    for match in PLACEHOLDER_PATTERN.finditer(line):
+        if match.start() > last:
+            pieces.append(line[last:match.start()])
+        if match.group(1) is None:
+            pieces.append(match.group(0)[0])  # Escaped brace
+        else:
+            pieces.append((match.group(1),))
+        last = match.end()
+    if last < len(line):
+        pieces.append(line[last:])
+
+    # Merge adjacent literals so that every field sits between two literals
+    merged = []
+    for piece in pieces:
+        if isinstance(piece, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += piece
+        else:
+            merged.append(piece)
+    for i in range(1, len(merged)):
+        if isinstance(merged[i], tuple) and isinstance(merged[i - 1], tuple):
+            raise TemplateError(f"line {number}: fields {merged[i - 1][0]} and {merged[i][0]} need text between them")
+    return merged
+
+def _fields(pieces):
+    return [piece[0] for piece in pieces if isinstance(piece, tuple)]
+
+def _brackets(pieces, i):
+    """Returns the (opening, closing) bracket a field is enclosed in, like "({email})", or None."""
+    before = pieces[i - 1] if i > 0 else ""
+    after = pieces[i + 1] if i + 1 < len(pieces) else ""
+    if before and before[-1] in BRACKETS and BRACKETS[before[-1]] in after:
+        return before[-1], BRACKETS[before[-1]]
+    return None
+
+def _compile_line(pieces, greedy_last=False):
+    """Compiles the pieces of a line into a regular expression capturing its fields.
+
+    A field enclosed in brackets cannot contain them, and the field before
+    it matches greedily, so that "{name} ({email})" takes the last group in
+    parentheses as the email even if the name has parentheses itself.
+    Trailing spaces are not significant, lines are matched after rstrip()."""
+    regex = ""
+    seen = set()
+    last_index = len(pieces) - 1
+    for i, piece in enumerate(pieces):
+        if isinstance(piece, str):
+            regex += re.escape(piece.rstrip() if i == last_index else piece)
+        elif piece[0] in seen:
+            regex += f"(?P={piece[0]})"
+        else:
+            seen.add(piece[0])
+            brackets = _brackets(pieces, i)
+            if brackets is not None:
+                regex += f"(?P<{piece[0]}>[^{re.escape(''.join(brackets))}]*)"
+            elif (greedy_last and i == last_index) or (i + 2 <= last_index and _brackets(pieces, i + 2)):
+                regex += f"(?P<{piece[0]}>.*)"
+            else:
+                regex += f"(?P<{piece[0]}>.*?)"
+    return re.compile(regex)
+
+def _render_line(pieces, values):
+    return "".join(piece if isinstance(piece, str) else values.get(piece[0], "") for piece in pieces)
+
+class _Line:
+    """A template line that appears once."""
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.regex = _compile_line(pieces)
+        # Lines with visible text can be searched for to find where a repeated section ends
+        self.anchor = any(isinstance(piece, tuple) or piece.strip("/ \t") for piece in pieces)
+
+class _Description:
+    """A template line repeated for every line of the (wrapped) description."""
+    def __init__(self, pieces):
+        if pieces[-1] != ("description",) or len(pieces) != 2:
+            raise TemplateError("the description must be the only field of its line and come last")
+        self.prefix = pieces[0]
+        self.pieces = pieces
+
+class _Authors:
+    """A template line repeated for every author, optionally followed by a line repeated for their points."""
+    def __init__(self, author_pieces, point_pieces):
+        self.author_pieces = author_pieces
+        self.author_regex = _compile_line(author_pieces)
+        self.point_pieces = point_pieces
+        self.point_regex = _compile_line(point_pieces, greedy_last=True) if point_pieces else None
+
+class HeaderTemplate:
+    """A header layout compiled into a matching renderer and parser.
+
+    Every line of a template is one "//" comment line of the header. Fields
+    are written in braces ({{ and }} for literal braces):
+
+    - {team}, {website}, {filename} and {year} on any line.
+    - {description} alone at the end of a line, repeated for every line of
+      the description, wrapped at 80 characters.
+    - {percent}, {name} and {email} on the author line, repeated for every
+      author. A line with {point} right after it is repeated for each of
+      the author's contribution points.
+
+    The last line of the template must contain some text, it marks the end
+    of the header in a file."""
+    def __init__(self, text):
+        self.text = text
+        self.key = "template:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+        self.items = []
+
+        lines = text.rstrip("\n").split("\n")
+        i = 0
+        while i < len(lines):
+            line = lines[i].rstrip("\r")
+            number = i + 1
+            if not line.lstrip().startswith("//"):
+                raise TemplateError(f"line {number}: every template line must be a // comment")
+            pieces = _split_line(line, number)
+            fields = set(_fields(pieces))
+            unknown = fields - LINE_FIELDS - AUTHOR_FIELDS - {"description", "point"}
+            if unknown:
+                raise TemplateError(f"line {number}: unknown field {{{sorted(unknown)[0]}}}")
+
+            if "description" in fields:
+                if len(fields) > 1:
+                    raise TemplateError(f"line {number}: the description must be alone on its line")
+                self.items.append(_Description(pieces))
+            elif fields & AUTHOR_FIELDS:
+                if fields - AUTHOR_FIELDS:
+                    raise TemplateError(f"line {number}: the author line only takes percent, name and email")
+                point_pieces = None
+                if i + 1 < len(lines) and "{point}" in lines[i + 1]:
+                    point_pieces = _split_line(lines[i + 1].rstrip("\r"), number + 1)
+                    if set(_fields(point_pieces)) != {"point"} or point_pieces[-1] != ("point",):
+                        raise TemplateError(f"line {number + 1}: the point must be alone at the end of its line")
+                    i += 1
+                self.items.append(_Authors(pieces, point_pieces))
+            elif "point" in fields:
+                raise TemplateError(f"line {number}: the {{point}} line must follow the author line")
+            else:
+                self.items.append(_Line(pieces))
+            i += 1
+
+        if not self.items or not isinstance(self.items[-1], _Line):
+            raise TemplateError("the last line of a template must be a plain line")
+        self.end_marker = max((piece.strip("/ \t") for piece in self.items[-1].pieces if isinstance(piece, str)),
+                              key=len, default="")
+        if not self.end_marker:
+            raise TemplateError("the last line of a template needs some text to mark the end of the header")
+
+    def render(self, header, filename=None, year=None):
+        """Renders a Header with this template, without a trailing line break."""
+        if filename is None:
+            filename = header.filename if header.filename is not None else "filename.ext"
+        if year is None:
+            year = header.year if header.year is not None else datetime.now().year
+        values = {"team": header.team or "", "website": header.website or "", "filename": filename, "year": str(year)}
+
+        lines = []
+        for item in self.items:
+            if isinstance(item, _Line):
+                lines.append(_render_line(item.pieces, values))
+            elif isinstance(item, _Description):
+                for line in wrap_description(header.description):
+                    lines.append(item.prefix + line)
+            else:
+                for author in header.authors:
+                    lines.append(_render_line(item.author_pieces, {"percent": author.percent.strip(),
+                                                                   "name": author.name.strip(),
+                                                                   "email": author.email.strip()}))
+                    if item.point_pieces is None:
+                        continue
+                    for point in author.points:
+                        point = point.strip()
+                        if point:  # Only add non-empty points
+                            lines.append(_render_line(item.point_pieces, {"point": point}))
+        return "\n".join(lines)
+
+    def parse(self, text, span=None):
+        """Parses a header written with this template. Lines that do not fit are reported in the header's errors."""
+        result = Header(span=span)
+        lines = [line.rstrip() for line in text.split("\n")]
+        pos = 0
+        for index, item in enumerate(self.items):
+            if isinstance(item, _Line):
+                pos = self._parse_line(item, lines, pos, result)
+            elif isinstance(item, _Description):
+                pos = self._parse_description(item, index, lines, pos, result)
+            else:
+                pos = self._parse_authors(item, lines, pos, result)
+        for number in range(pos, len(lines)):
+            if lines[number]:
+                result.errors.append(ParseError(number + 1, "Unexpected line after the header"))
+        return result
+
+    def _parse_line(self, item, lines, pos, result):
+        # Skip (and report) lines until the expected one shows up
+        for i in range(pos, len(lines)):
+            match = item.regex.fullmatch(lines[i])
+            if match is not None:
+                for number in range(pos, i):
+                    result.errors.append(ParseError(number + 1, "Unexpected line"))
+                self._store(result, match)
+                return i + 1
+            if not item.anchor:
+                break
+        result.errors.append(ParseError(pos + 1, "Expected: " + _render_line(item.pieces, {}).strip()))
+        return pos
+
+    def _parse_description(self, item, index, lines, pos, result):
+        # The description runs until the next line that can be recognized, minus the plain lines before it
+        end = len(lines)
+        following = 0
+        for next_item in self.items[index + 1:]:
+            if isinstance(next_item, _Line) and not next_item.anchor:
+                following += 1
+                continue
+            regex = next_item.regex if isinstance(next_item, _Line) else next_item.author_regex
+            for i in range(pos, len(lines)):
+                if regex.fullmatch(lines[i]):
+                    end = i
+                    break
+            break
+        end = max(pos, end - following)
+
+        prefix = item.prefix
+        stripped_prefix = prefix.rstrip()
+        description_lines = []
+        for line in lines[pos:end]:
+            if line.startswith(prefix):
+                description_lines.append(line[len(prefix):])
+            elif line.startswith(stripped_prefix):
+                description_lines.append(line[len(stripped_prefix):])
+            else:
+                description_lines.append(line)
+        result.description = "\n".join(description_lines)
+        return end
+
+    def _parse_authors(self, item, lines, pos, result):
+        current_author = None
+        while pos < len(lines):
+            match = item.author_regex.fullmatch(lines[pos])
+            if match is not None:
+                current_author = Author(match.group("percent").strip() if "percent" in match.re.groupindex else "",
+                                        match.group("name").strip() if "name" in match.re.groupindex else "",
+                                        match.group("email").strip() if "email" in match.re.groupindex else "")
+                result.authors.append(current_author)
+            elif item.point_regex is not None and current_author is not None:
+                match = item.point_regex.fullmatch(lines[pos])
+                if match is None:
+                    break
+                current_author.points.append(match.group("point").strip())
+            else:
+                break
+            pos += 1
+        return pos
+
+    def _store(self, result, match):
+        for field, value in match.groupdict().items():
+            value = value.strip()
+            if field == "year":
+                if value.isdigit():
+                    result.year = int(value)
+            else:
+                setattr(result, field, value)
+
+@functools.lru_cache(maxsize=16)
+def compile_template(text):
+    """Compiles a template, reusing the compiled template for the same text."""
+    return HeaderTemplate(text)
+
+def get_format(template_text=None):
+    """Returns the header format of a template text, or the built-in format for None."""
+    if template_text is None:
+        return DEFAULT_FORMAT
+    return compile_template(template_text)
+
+def read_template(directory, template_path=None):
+    """Reads the template of a project: template_path if given, else the template file at the root of directory.
+
+    Returns None when there is none, meaning the built-in format."""
+    if template_path is None:
+        template_path = os.path.join(directory, TEMPLATE_FILE_NAME)
+        if not os.path.isfile(template_path):
+            return None
+    with open(template_path, "r", encoding="utf-8") as file:
+        return file.read()
@@ -0,0 +1,47 @@
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+def iter_chunks(items, chunk_size):
+    """Yields lists of up to chunk_size items, consuming items lazily."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def iter_chunk_results(worker, items, args=(), chunk_size=64, jobs=None, cancelled=None):
+    """Calls worker(chunk, *args) on chunks of items in a process pool, yielding each result as it completes.
+
+    Only a couple of chunks per worker are in flight at a time, so items can
+    be a generator and setting the cancelled event stops the work quickly;
+    chunks already handed out still finish and are yielded. Results come in
+    completion order."""
+    chunks = iter_chunks(items, chunk_size)
+    jobs = jobs or os.cpu_count() or 1
+    # A single chunk is not worth starting worker processes for
+    head = list(itertools.islice(chunks, 2))
+    chunks = itertools.chain(head, chunks)
+    if jobs == 1 or len(head) < 2:
+        for chunk in chunks:
+            if cancelled is not None and cancelled.is_set():
+                return
+            yield worker(chunk, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        exhausted = False
+        while not exhausted or pending:
+            while not exhausted and len(pending) < jobs * 2:
+                chunk = None if cancelled is not None and cancelled.is_set() else next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(worker, chunk, *args))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
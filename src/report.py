@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+import queue
+import threading
+from header_core import read_header
+from header_template import get_format
+from pool import iter_chunk_results
+
+# Files handed to a worker process at a time, each worker sends back one partial report per chunk
+REPORT_CHUNK_SIZE = 256
+
+# Columns of the CSV output and of the report panel
+REPORT_COLUMNS = ("name", "email", "files", "total_percent", "average_percent", "file_share", "points")
+
+class AuthorStats:
+    """Totals of one author over the headers of a tree.
+
+    total_percent adds up the author's percentage in every header, so
+    file_share (total_percent / 100) is the number of whole files the author
+    accounts for. Percentages that are not numbers count as 0."""
+    __slots__ = ("name", "email", "files", "total_percent", "points")
+
+    def __init__(self, name, email, files=0, total_percent=0.0, points=0):
+        self.name = name
+        self.email = email
+        self.files = files
+        self.total_percent = total_percent
+        self.points = points
+
+    @property
+    def average_percent(self):
+        return self.total_percent / self.files if self.files else 0.0
+
+    @property
+    def file_share(self):
+        return self.total_percent / 100
+
+    def merge(self, other):
+        self.files += other.files
+        self.total_percent += other.total_percent
+        self.points += other.points
+
+    def to_dict(self):
+        return {"name": self.name, "email": self.email, "files": self.files,
+                "total_percent": round(self.total_percent, 2), "average_percent": round(self.average_percent, 2),
+                "file_share": round(self.file_share, 2), "points": self.points}
+
+def author_key(name, email):
+    """Authors are told apart by email, or by name when they have none."""
+    return (email or name).strip().lower()
+
+class ContributionReport:
+    """Per-author statistics of a set of files, built from partial reports that merge into each other."""
+    def __init__(self):
+        self.authors = {}  # author_key() -> AuthorStats
+        self.files = 0
+        self.missing = 0   # Files without a header
+        self.errors = 0    # Files that could not be read
+
+    def add_header(self, header):
+        self.files += 1
+        seen = set()
+        for author in header.authors:
+            key = author_key(author.name, author.email)
+            stats = self.authors.get(key)
+            if stats is None:
+                stats = self.authors[key] = AuthorStats(author.name.strip(), author.email.strip())
+            if key not in seen:
+                # An author listed twice in a header is still on one file
+                stats.files += 1
+                seen.add(key)
+            try:
+                stats.total_percent += float(author.percent)
+            except ValueError:
+                pass
+            stats.points += sum(1 for point in author.points if point.strip())
+
+    def merge(self, other):
+        """Adds the totals of another partial report to this one."""
+        self.files += other.files
+        self.missing += other.missing
+        self.errors += other.errors
+        for key, stats in other.authors.items():
+            mine = self.authors.get(key)
+            if mine is None:
+                self.authors[key] = stats
+            else:
+                mine.merge(stats)
+
+    def sorted_authors(self):
+        """Returns the authors with the largest file share first."""
+        return sorted(self.authors.values(), key=lambda stats: (-stats.total_percent, stats.name.lower()))
+
+    def to_dict(self):
+        return {"files": self.files, "missing": self.missing, "errors": self.errors,
+                "authors": [stats.to_dict() for stats in self.sorted_authors()]}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_csv(self):
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=REPORT_COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        for stats in self.sorted_authors():
+            writer.writerow(stats.to_dict())
+        return output.getvalue()
+
+def report_files(paths, template=None):
+    """Worker process entry point: returns the partial report of a chunk of files."""
+    header_format = get_format(template)
+    report = ContributionReport()
+    for path in paths:
+        try:
+            location = read_header(path, end_marker=header_format.end_marker)
+        except (OSError, UnicodeDecodeError):
+            report.errors += 1
+            continue
+        if not location.text:
+            report.files += 1
+            report.missing += 1
+            continue
+        report.add_header(header_format.parse(location.text))
+    return report
+
+def build_report(paths, jobs=None, template=None, cancelled=None, progress=None):
+    """Builds the contribution report of many files across worker processes.
+
+    paths can be a generator, it is consumed a chunk at a time and each
+    chunk's partial report is merged as soon as it completes, so neither the
+    paths nor the headers are ever all in memory. progress(files done) is
+    called after every chunk."""
+    report = ContributionReport()
+    for partial in iter_chunk_results(report_files, paths, (template,), REPORT_CHUNK_SIZE, jobs, cancelled):
+        report.merge(partial)
+        if progress is not None:
+            progress(report.files + report.errors)
+    return report
+
+class ReportJob:
+    """Runs build_report on a worker thread for the UI.
+
+    The queue receives the number of files done as the report progresses,
+    then the finished ContributionReport (or the exception that stopped
+    it), then None."""
+    def __init__(self, paths, jobs=None, template=None):
+        self.paths = paths
+        self.jobs = jobs
+        self.template = template
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            self.queue.put(build_report(self.paths, self.jobs, self.template, self.cancelled, self.queue.put))
+        except Exception as e:
+            self.queue.put(e)
+        finally:
+            self.queue.put(None)
@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from tree_index import TreeIndex
+
+APP_NAME = "HeaderCommenter"
+
+# Older versions kept the last directory in the working directory, it is still read if nothing newer exists
+LEGACY_CONFIG_FILE = "headercommenter-config.txt"
+LAST_DIRECTORY_FILE = "last-directory.txt"
+
+# Bump when the snapshot layout changes, older snapshots are then ignored
+SNAPSHOT_VERSION = 1
+
+def user_config_dir():
+    """Returns the per-user directory of the app's settings and caches, creating it if needed."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        path = os.path.join(base, APP_NAME)
+    elif sys.platform == "darwin":
+        path = os.path.join(os.path.expanduser("~/Library/Application Support"), APP_NAME)
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        path = os.path.join(base, APP_NAME.lower())
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        pass  # Reads find nothing and writes report the error
+    return path
+
+def write_file_atomically(path, data):
+    """Writes bytes to path through a temporary file, so a crash never leaves half a file behind."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def read_last_directory():
+    """Returns the directory open at the end of the last session, or None."""
+    for path in (os.path.join(user_config_dir(), LAST_DIRECTORY_FILE), LEGACY_CONFIG_FILE):
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                directory = file.read().strip()
+        except OSError:
+            continue
+        if directory:
+            return directory
+    return None
+
+def write_last_directory(directory):
+    write_file_atomically(os.path.join(user_config_dir(), LAST_DIRECTORY_FILE), directory.encode("utf-8"))
+
+def snapshot_path(directory):
+    """Returns where the snapshot of a directory's tree is stored."""
+    key = hashlib.sha1(os.path.abspath(directory).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(user_config_dir(), "snapshots", key + ".gz")
+
+def save_snapshot(index, state):
+    """Stores the files of a TreeIndex with the view state of the session (a JSON-able dict).
+
+    The snapshot is a gzipped text file: a line of JSON metadata, then one
+    line per directory with files, its relative path followed by the names
+    of its files, tab separated. Directory prefixes are written once, which
+    keeps it small and fast to load."""
+    lines = [json.dumps({"version": SNAPSHOT_VERSION, "directory": os.path.abspath(index.directory), "state": state})]
+    for rel_dir, node in sorted(index.nodes.items()):
+        if node.files:
+            lines.append("\t".join([rel_dir, *sorted(node.files)]))
+    write_file_atomically(snapshot_path(index.directory), gzip.compress("\n".join(lines).encode("utf-8"), 1))
+
+def load_snapshot(directory):
+    """Returns the (TreeIndex, state) stored for a directory, or None if there is no usable snapshot."""
+    try:
+        with open(snapshot_path(directory), "rb") as file:
+            lines = gzip.decompress(file.read()).decode("utf-8").split("\n")
+        metadata = json.loads(lines[0])
+    except (OSError, EOFError, ValueError):
+        return None  # Missing or damaged
+    if metadata.get("version") != SNAPSHOT_VERSION or metadata.get("directory") != os.path.abspath(directory):
+        return None
+
+    index = TreeIndex(directory)
+    for line in lines[1:]:
+        rel_dir, *names = line.split("\t")
+        index.add_dir_files(rel_dir, names)
+    return index, metadata.get("state") or {}
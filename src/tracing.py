@@ -0,0 +1,91 @@
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+# Oldest spans are dropped once a session recorded this many
+MAX_TRACE_EVENTS = 200000
+
+class _NullSpan:
+    """Span used while tracing is off, entering and leaving it does nothing."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+class Tracer:
+    """Records named timing spans of the current session.
+
+    While disabled, span() returns a shared no-op context manager and traced
+    functions only pay for one attribute check, so the instrumentation can
+    stay in the hot paths."""
+    def __init__(self, max_events=MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.events = collections.deque(maxlen=max_events)  # (name, start ns, duration ns, thread id)
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name):
+        """Returns a context manager timing the code it wraps under name."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name, start, duration):
+        self.events.append((name, start, duration, threading.get_ident()))
+
+    def recent(self, count):
+        """Returns the last count spans as (name, duration in ms), newest first."""
+        events = list(self.events)[-count:]
+        return [(name, duration / 1e6) for name, _, duration, _ in reversed(events)]
+
+    def clear(self):
+        self.events.clear()
+        self.origin = time.perf_counter_ns()
+
+    def chrome_trace(self):
+        """Returns the recorded spans in the Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "ts": (start - self.origin) / 1000, "dur": duration / 1000,
+                   "pid": pid, "tid": tid}
+                  for name, start, duration, tid in list(self.events)]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        """Writes the recorded spans to path as Chrome trace event JSON."""
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+# Shared by the whole application
+tracer = Tracer()
+
+def traced(name):
+    """Decorator timing every call of a function as a span called name."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            with _Span(tracer, name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+import os
+
+class DirectoryNode:
+    """A directory of the index with its subdirectories and the C++ files directly inside it."""
+    __slots__ = ("path", "dirs", "files")
+
+    def __init__(self, path):
+        self.path = path  # Relative, '/' separated and '/' terminated ("" for the root)
+        self.dirs = {}    # name -> DirectoryNode
+        self.files = {}   # name -> full path
+
+def parent_path(rel_path):
+    """Returns the relative path of the directory containing rel_path ("" for top level entries)."""
+    end = rel_path.rstrip("/").rfind("/")
+    return rel_path[:end + 1]
+
+class TreeIndex:
+    """In-memory index of the C++ files of a directory, kept apart from the tree view.
+
+    Paths are relative to the indexed directory and '/' separated, directory
+    paths end with '/'."""
+    def __init__(self, directory):
+        self.directory = directory
+        self.root = DirectoryNode("")
+        self.nodes = {"": self.root}
+        self.file_count = 0
+
+    def get_dir(self, rel_dir):
+        """Returns the node of a directory, or None if it is not indexed."""
+        return self.nodes.get(rel_dir)
+
+    def add_file(self, full_path, relative_path):
+        """Adds a file and its directories, returning the paths of the directories that were created.
+
+        Adding a file that is already indexed only updates its full path."""
+        parts = relative_path.replace(os.sep, "/").split("/")
+        node = self.root
+        created = []
+        for part in parts[:-1]:
+            child = node.dirs.get(part)
+            if child is None:
+                child = DirectoryNode(node.path + part + "/")
+                node.dirs[part] = child
+                self.nodes[child.path] = child
+                created.append(child.path)
+            node = child
+
+        if parts[-1] not in node.files:
+            self.file_count += 1
+        node.files[parts[-1]] = full_path
+        return created
+
+    def add_dir_files(self, rel_dir, names):
+        """Adds files of one directory by name, much faster than add_file() for whole directories."""
+        node = self.root
+        for part in rel_dir.split("/")[:-1]:
+            child = node.dirs.get(part)
+            if child is None:
+                child = DirectoryNode(node.path + part + "/")
+                node.dirs[part] = child
+                self.nodes[child.path] = child
+            node = child
+
+        prefix = os.path.join(self.directory, rel_dir.replace("/", os.sep))
+        count = len(node.files)
+        node.files.update({name: prefix + name for name in names})
+        self.file_count += len(node.files) - count
+
+    def remove_file(self, relative_path):
+        """Removes a file, returning the paths of the directories that became empty and were removed too."""
+        rel_path = relative_path.replace(os.sep, "/")
+        node = self.nodes.get(parent_path(rel_path))
+        name = rel_path.rsplit("/", 1)[-1]
+        if node is None or name not in node.files:
+            return []
+        del node.files[name]
+        self.file_count -= 1
+
+        # Directories only exist while they contain files
+        removed = []
+        while node is not self.root and not node.files and not node.dirs:
+            parent = self.nodes[parent_path(node.path)]
+            del parent.dirs[node.path.rstrip("/").rsplit("/", 1)[-1]]
+            del self.nodes[node.path]
+            removed.append(node.path)
+            node = parent
+        return removed
+
+    def iter_files(self, rel_dir=""):
+        """Yields (full path, relative path) for every file under a directory."""
+        stack = [self.nodes[rel_dir]] if rel_dir in self.nodes else []
+        while stack:
+            node = stack.pop()
+            for name, full_path in node.files.items():
+                yield full_path, node.path + name
+            stack.extend(node.dirs.values())
@@ -0,0 +1,311 @@
+import contextlib
+import os
+import queue
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from header_core import COPYRIGHT_MARKER, read_header, remove_header, write_header
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+JOURNAL_FILE = "undo-journal.log"
+
+# Past this size the oldest batches are dropped until the journal is back under MAX * TRIM_TO
+MAX_JOURNAL_BYTES = 16 * 1024 * 1024
+JOURNAL_TRIM_TO = 0.75
+
+# Every record: payload length, CRC-32 of the payload, batch id, then the zlib compressed payload.
+# A record without payload marks the end of its batch.
+RECORD_HEADER = struct.Struct("<IIQ")
+
+# Batches never finished (their process crashed) can be dropped once they are this old
+STALE_BATCH_SECONDS = 24 * 60 * 60
+
+# Rolled back files are handed to the UI this many at a time
+ROLLBACK_BATCH_SIZE = 64
+
+# Result status of a rolled back entry
+STATUS_REVERTED = "reverted"
+STATUS_CONFLICT = "conflict"
+STATUS_ERROR = "error"
+
+class JournalEntry:
+    """One save of a header: the file and its header text before and after the save.
+
+    end_marker is the last line marker of the header format the file was saved with."""
+    __slots__ = ("batch", "label", "filepath", "end_marker", "old", "new")
+
+    def __init__(self, batch, label, filepath, end_marker, old, new):
+        self.batch = batch
+        self.label = label
+        self.filepath = filepath
+        self.end_marker = end_marker
+        self.old = old
+        self.new = new
+
+    def encode(self):
+        fields = (self.label, self.filepath, self.end_marker, self.old, self.new)
+        payload = zlib.compress("\0".join(fields).encode("utf-8"))
+        return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), self.batch) + payload
+
+    @classmethod
+    def decode(cls, batch, payload):
+        return cls(batch, *zlib.decompress(payload).decode("utf-8").split("\0"))
+
+class BatchInfo:
+    """Summary of a batch of saves: when it started, what made it and how many files it wrote."""
+    __slots__ = ("batch", "label", "first_file", "count")
+
+    def __init__(self, batch, label, first_file, count):
+        self.batch = batch
+        self.label = label
+        self.first_file = first_file
+        self.count = count
+
+    @property
+    def time(self):
+        return self.batch / 1e6  # Batch ids are the time they started at in microseconds
+
+@contextlib.contextmanager
+def journal_lock(path, exclusive):
+    """Holds the lock of a journal, which every process writing to it shares.
+
+    Appends take it shared, they do not get in each other's way as every
+    record is a single O_APPEND write. Trimming takes it exclusive, so that
+    nothing is appended to the file it is about to replace. Windows only has
+    exclusive locks."""
+    fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if sys.platform == "win32":
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # Retries for 10 seconds, then raises OSError
+            try:
+                yield
+            finally:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield  # Closing the descriptor releases the lock
+    finally:
+        os.close(fd)
+
+def append_records(path, data):
+    """Appends encoded records to the journal file with a single write."""
+    with journal_lock(path, exclusive=False):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o600)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+def iter_records(file):
+    """Yields (offset, batch id, payload length) for every record of a journal, seeking over the payloads.
+
+    Reading stops at the first incomplete record, which a crash in the
+    middle of an append leaves behind."""
+    offset = 0
+    size = os.fstat(file.fileno()).st_size
+    while offset + RECORD_HEADER.size <= size:
+        file.seek(offset)
+        length, _, batch = RECORD_HEADER.unpack(file.read(RECORD_HEADER.size))
+        if offset + RECORD_HEADER.size + length > size:
+            return
+        yield offset, batch, length
+        offset += RECORD_HEADER.size + length
+
+def read_payload(file, offset, length):
+    """Returns the payload of the record at offset, None if it is damaged."""
+    file.seek(offset)
+    _, crc, _ = RECORD_HEADER.unpack(file.read(RECORD_HEADER.size))
+    payload = file.read(length)
+    return payload if zlib.crc32(payload) == crc else None
+
+class JournalBatch:
+    """Records the saves of one batch. Only holds the journal path and the batch, so worker processes can record too."""
+    def __init__(self, path, batch, label):
+        self.path = path
+        self.batch = batch
+        self.label = label
+
+    def record(self, filepath, old, new, end_marker=COPYRIGHT_MARKER):
+        """Appends the save of a header to the journal."""
+        entry = JournalEntry(self.batch, self.label, os.path.abspath(filepath), end_marker, old, new)
+        append_records(self.path, entry.encode())
+
+    def end_record(self):
+        return RECORD_HEADER.pack(0, 0, self.batch)
+
+class UndoJournal:
+    """Append-only log of header saves, rolled back a batch or a file at a time.
+
+    Only the old and new header text of each save is kept, compressed, never
+    a copy of the file. A batch is one save from the editor or every file of
+    a bulk edit or fix. Once the log grows past max_bytes its oldest batches
+    are dropped. Only finished batches are dropped, whichever process is
+    still recording the others, and the newest batch is always kept."""
+    def __init__(self, path, max_bytes=MAX_JOURNAL_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.last_batch = 0
+
+    def start_batch(self, label):
+        """Returns a new JournalBatch, its id being the current time in microseconds.
+
+        Hand it to finish_batch() once everything is recorded."""
+        with self.lock:
+            self.last_batch = max(time.time_ns() // 1000, self.last_batch + 1)
+            return JournalBatch(self.path, self.last_batch, label)
+
+    def finish_batch(self, batch):
+        """Marks the end of a batch in the journal, from then on it may be trimmed."""
+        append_records(self.path, batch.end_record())
+        self.trim()
+
+    def record(self, label, filepath, old, new, end_marker=COPYRIGHT_MARKER):
+        """Records a single save as a batch of its own."""
+        batch = self.start_batch(label)
+        entry = JournalEntry(batch.batch, label, os.path.abspath(filepath), end_marker, old, new)
+        append_records(self.path, entry.encode() + batch.end_record())
+        self.trim()
+
+    def batches(self):
+        """Returns a BatchInfo for every batch in the journal, newest first."""
+        infos = {}
+        try:
+            with open(self.path, "rb") as file:
+                for offset, batch, length in iter_records(file):
+                    if not length:
+                        continue  # End of a batch
+                    info = infos.get(batch)
+                    if info is None:
+                        payload = read_payload(file, offset, length)
+                        if payload is None:
+                            continue
+                        entry = JournalEntry.decode(batch, payload)
+                        infos[batch] = BatchInfo(batch, entry.label, entry.filepath, 1)
+                    else:
+                        info.count += 1
+        except FileNotFoundError:
+            return []
+        return sorted(infos.values(), key=lambda info: info.batch, reverse=True)
+
+    def entries(self, batch):
+        """Returns the JournalEntries of a batch, in the order they were saved."""
+        entries = []
+        try:
+            with open(self.path, "rb") as file:
+                for offset, record_batch, length in iter_records(file):
+                    if record_batch == batch and length:
+                        payload = read_payload(file, offset, length)
+                        if payload is not None:
+                            entries.append(JournalEntry.decode(batch, payload))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def rollback(self, entries, cancelled=None):
+        """Puts back the old header of each entry, newest first, yielding (filepath, status, message).
+
+        A file whose header is no longer the one the entry saved is left
+        alone and reported as a conflict. The rollback is recorded as a batch
+        of its own, so it can be rolled back in turn."""
+        batch = self.start_batch("Rollback")
+        try:
+            for entry in reversed(entries):
+                if cancelled is not None and cancelled.is_set():
+                    break
+                try:
+                    if read_header(entry.filepath, end_marker=entry.end_marker).text != entry.new:
+                        yield entry.filepath, STATUS_CONFLICT, "the header changed since"
+                        continue
+                    if entry.old:
+                        write_header(entry.filepath, entry.old, end_marker=entry.end_marker)
+                    else:
+                        remove_header(entry.filepath, end_marker=entry.end_marker)
+                    batch.record(entry.filepath, entry.new, entry.old, entry.end_marker)
+                    yield entry.filepath, STATUS_REVERTED, entry.old
+                except Exception as e:
+                    yield entry.filepath, STATUS_ERROR, str(e)
+        finally:
+            self.finish_batch(batch)
+
+    def is_full(self):
+        try:
+            return os.path.getsize(self.path) > self.max_bytes
+        except OSError:
+            return False
+
+    def trim(self):
+        """Drops the oldest batches once the journal is larger than max_bytes and no batch is open.
+
+        The records kept are copied one by one to a new file that replaces
+        the journal, it is never read into memory as a whole. Other processes
+        wait with their appends until the new file is in place."""
+        if not self.is_full():
+            return  # Most of the time, without taking the lock
+        with self.lock, journal_lock(self.path, exclusive=True):
+            if not self.is_full():
+                return
+            size = os.path.getsize(self.path)
+
+            with open(self.path, "rb") as source:
+                records = list(iter_records(source))
+                if not records:
+                    return
+                newest = max(batch for _, batch, _ in records)
+                stale = (time.time() - STALE_BATCH_SECONDS) * 1e6
+                finished = {batch for _, batch, length in records if not length or batch < stale}
+                # Batches with a record before the cut go, records of different batches may interleave
+                cut = size - int(self.max_bytes * JOURNAL_TRIM_TO)
+                dropped = {batch for offset, batch, _ in records
+                           if offset < cut and batch in finished and batch != newest}
+
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as destination:
+                        for offset, batch, length in records:
+                            if batch not in dropped:
+                                source.seek(offset)
+                                destination.write(source.read(RECORD_HEADER.size + length))
+                    os.replace(temp_path, self.path)
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+
+class RollbackJob:
+    """Runs UndoJournal.rollback on a worker thread and queues its results for the UI.
+
+    The queue receives lists of results, then None once the job is done."""
+    def __init__(self, journal, entries):
+        self.journal = journal
+        self.entries = entries
+        self.queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        batch = []
+        try:
+            for result in self.journal.rollback(self.entries, self.cancelled):
+                batch.append(result)
+                if len(batch) >= ROLLBACK_BATCH_SIZE:
+                    self.queue.put(batch)
+                    batch = []
+            self.queue.put(batch)
+        except Exception as e:
+            self.queue.put([("", STATUS_ERROR, str(e))])
+        finally:
+            self.queue.put(None)
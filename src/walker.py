@@ -0,0 +1,211 @@
+import os
+import re
+from header_core import CPP_EXTENSIONS
+
+# Files holding ignore rules, read in every directory of the tree. Both use the .gitignore syntax.
+IGNORE_FILE_NAMES = (".gitignore", ".headercommenterignore")
+
+# Always skipped, whatever the ignore files say
+DEFAULT_IGNORE_PATTERNS = [".git/", ".hg/", ".svn/"]
+
+class IgnoreRule:
+    """A single compiled line of an ignore file."""
+    __slots__ = ("regex", "negate", "dir_only", "anchored", "base")
+
+    def __init__(self, regex, negate, dir_only, anchored, base):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+        self.base = base
+
+    def matches(self, rel_path, name, is_dir):
+        """Checks the rule against a '/' separated path relative to the walked directory."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.anchored:
+            if self.base:
+                if not rel_path.startswith(self.base):
+                    return False
+                rel_path = rel_path[len(self.base):]
+            return self.regex.fullmatch(rel_path) is not None
+        if self.base and not rel_path.startswith(self.base):
+            return False
+        return self.regex.fullmatch(name) is not None
+
+def _translate_pattern(pattern):
+    """Translates a gitignore glob into a regular expression."""
+    regex = ""
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                if at_start and pattern.startswith("**/", i):
+                    regex += "(?:.*/)?"  # Any number of leading directories
+                    i += 3
+                    continue
+                if at_start and i + 2 == n:
+                    regex += ".*"  # Everything inside
+                    i += 2
+                    continue
+            regex += "[^/]*"
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            regex += "[^/]"
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "]") else i + 1)
+            if end == -1:
+                regex += re.escape(c)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                regex += "[" + body.replace("\\", "\\\\") + "]"
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(c)
+        i += 1
+    return regex
+
+def parse_ignore_lines(lines, base=""):
+    """Compiles the lines of an ignore file found in the directory base (relative, '/' terminated)."""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("#"):
+            continue
+
+        # Trailing spaces are ignored unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+
+        # A slash anywhere but at the end anchors the pattern to the ignore file's directory
+        anchored = "/" in line
+        line = line.lstrip("/")
+        try:
+            regex = re.compile(_translate_pattern(line), re.DOTALL)
+        except re.error:
+            continue  # Malformed patterns are skipped like git does
+        rules.append(IgnoreRule(regex, negate, dir_only, anchored, base))
+    return rules
+
+def read_ignore_file(path, base=""):
+    """Reads and compiles an ignore file, returning no rules if it cannot be read."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as file:
+            return parse_ignore_lines(file, base)
+    except OSError:
+        return []
+
+def is_ignored(rules, rel_path, name, is_dir):
+    """Checks a path against rules, the last matching rule wins."""
+    for rule in reversed(rules):
+        if rule.matches(rel_path, name, is_dir):
+            return not rule.negate
+    return False
+
+DEFAULT_IGNORE_RULES = parse_ignore_lines(DEFAULT_IGNORE_PATTERNS)
+
+class IgnoreTree:
+    """The ignore rules of a directory tree, read only for the directories of the paths checked.
+
+    Gives the same answers as iter_cpp_files walking the tree, for paths
+    that come from somewhere else, such as git."""
+    def __init__(self, directory):
+        self.directory = directory
+        # Rules applying to the entries of each relative directory ('/' terminated), None if it is ignored
+        self.rules = {}
+
+    def directory_rules(self, rel_dir):
+        if rel_dir in self.rules:
+            return self.rules[rel_dir]
+        if rel_dir:
+            parent_dir, _, name = rel_dir[:-1].rpartition("/")
+            parent_dir = parent_dir + "/" if parent_dir else ""
+            rules = self.directory_rules(parent_dir)
+            if rules is not None and is_ignored(rules, rel_dir[:-1], name, True):
+                rules = None
+        else:
+            rules = list(DEFAULT_IGNORE_RULES)
+        if rules is not None:
+            path = os.path.join(self.directory, rel_dir.replace("/", os.sep))
+            for ignore_name in IGNORE_FILE_NAMES:
+                rules = rules + read_ignore_file(os.path.join(path, ignore_name), rel_dir)
+        self.rules[rel_dir] = rules
+        return rules
+
+    def is_ignored(self, rel_path):
+        """Checks a '/' separated file path relative to the directory, and every directory above it."""
+        rel_dir, _, name = rel_path.rpartition("/")
+        rules = self.directory_rules(rel_dir + "/" if rel_dir else "")
+        return rules is None or is_ignored(rules, rel_path, name, False)
+
+def iter_cpp_files(directory, use_ignore_files=True, on_directory=None, rel_dir="", rules=None):
+    """Recursively finds all C++ files and yields them as (fullpath, relative path) while walking.
+
+    Directories excluded by the ignore files are pruned without being read.
+    Entries are yielded in name order, the files of a directory before its
+    subdirectories. on_directory(path, rel_dir, rules) is called for every
+    directory walked with the rules that apply to its entries. To walk a
+    subdirectory of a tree, pass its relative path ('/' terminated) and the
+    rules of its parent as rel_dir and rules."""
+    rules = list(DEFAULT_IGNORE_RULES) if rules is None else rules
+    stack = [(directory, rel_dir, rules)]
+
+    while stack:
+        path, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue  # Unreadable directory
+
+        if use_ignore_files:
+            for entry in entries:
+                if entry.name in IGNORE_FILE_NAMES:
+                    rules = rules + read_ignore_file(entry.path, rel_dir)
+        if on_directory is not None:
+            on_directory(path, rel_dir, rules)
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            rel_path = rel_dir + name
+            if is_dir:
+                if not is_ignored(rules, rel_path, name, True):
+                    subdirs.append((entry.path, rel_path + "/", rules))
+            elif os.path.splitext(name)[1].lower() in CPP_EXTENSIONS:
+                if not is_ignored(rules, rel_path, name, False):
+                    yield entry.path, rel_path if os.sep == "/" else rel_path.replace("/", os.sep)
+
+        # Reversed so that the first subdirectory is walked first
+        stack.extend(reversed(subdirs))
+
+def get_cpp_files(directory, use_ignore_files=True):
+    """Recursively finds all C++ files and returns them as a list of (fullpath, relative path)."""
+    return list(iter_cpp_files(directory, use_ignore_files))
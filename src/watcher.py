@@ -0,0 +1,174 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+from header_core import CPP_EXTENSIONS
+from walker import is_ignored, iter_cpp_files
+
+# Events put on a watcher's queue as (kind, full path, relative path), relative paths are '/' separated
+EVENT_CHANGED = "changed"          # A file was created, modified or moved in
+EVENT_REMOVED = "removed"          # A file was deleted or moved out
+EVENT_REMOVED_DIR = "removed_dir"  # A directory was deleted or moved out, with everything in it
+EVENT_RESCAN = "rescan"            # Events were lost, the whole tree must be read again
+
+# The polling fallback compares the tree to its last snapshot this often
+POLL_INTERVAL_SECONDS = 2.0
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+def is_cpp_file(name):
+    return os.path.splitext(name)[1].lower() in CPP_EXTENSIONS
+
+class InotifyWatcher:
+    """Watches a tree with Linux inotify, one watch per (not ignored) directory.
+
+    Only the directories and files that actually change are looked at, so
+    keeping a huge tree current costs in proportion to the changes. Files
+    are reported on close after writing rather than on every write. Changes
+    to ignore files only take effect when the tree is opened again."""
+    def __init__(self, directory):
+        self.directory = directory
+        self.queue = queue.Queue()
+        self.stopped = threading.Event()
+        self.watches = {}  # watch descriptor -> (path, relative directory, rules)
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def add_watch(self, path, rel_dir, rules):
+        # Past the user's watch limit (fs.inotify.max_user_watches) directories go unwatched
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = (path, rel_dir, rules)
+
+    def watch_tree(self, path, rel_dir, rules, report):
+        """Watches a directory and everything below it, reporting its files as changed if report is set."""
+        for full_path, rel_path in iter_cpp_files(path, on_directory=self.add_watch, rel_dir=rel_dir, rules=rules):
+            if report:
+                self.queue.put((EVENT_CHANGED, full_path, rel_path.replace(os.sep, "/")))
+
+    def forget_tree(self, rel_dir):
+        """Drops the watches of a directory that moved away and everything below it."""
+        for wd, (_, watched_dir, _) in list(self.watches.items()):
+            if watched_dir.startswith(rel_dir):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def run(self):
+        try:
+            self.watch_tree(self.directory, "", None, report=False)
+            while not self.stopped.is_set():
+                ready, _, _ = select.select([self.fd], [], [], 0.5)
+                if ready:
+                    self.handle(os.read(self.fd, 64 * 1024))
+        except OSError:
+            self.queue.put((EVENT_RESCAN, self.directory, ""))
+        finally:
+            os.close(self.fd)
+
+    def handle(self, data):
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.queue.put((EVENT_RESCAN, self.directory, ""))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            watch = self.watches.get(wd)
+            if watch is None or not name:
+                continue
+            path, rel_dir, rules = watch
+            full_path = os.path.join(path, name)
+            rel_path = rel_dir + name
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    if not is_ignored(rules, rel_path, name, True):
+                        self.watch_tree(full_path, rel_path + "/", rules, report=True)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.forget_tree(rel_path + "/")
+                    self.queue.put((EVENT_REMOVED_DIR, full_path, rel_path + "/"))
+            elif is_cpp_file(name) and not is_ignored(rules, rel_path, name, False):
+                if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    self.queue.put((EVENT_CHANGED, full_path, rel_path))
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.queue.put((EVENT_REMOVED, full_path, rel_path))
+
+class PollingWatcher:
+    """Watches a tree by walking it every POLL_INTERVAL_SECONDS and comparing file times and sizes.
+
+    Used where inotify is not available. Every poll costs a walk of the
+    whole tree, but it happens on a background thread."""
+    def __init__(self, directory, interval=POLL_INTERVAL_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self.queue = queue.Queue()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def snapshot(self):
+        """Returns relative path -> (full path, mtime, size) for every file of the tree."""
+        files = {}
+        for full_path, rel_path in iter_cpp_files(self.directory):
+            try:
+                stat = os.stat(full_path)
+            except OSError:
+                continue
+            files[rel_path.replace(os.sep, "/")] = (full_path, stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def run(self):
+        previous = self.snapshot()
+        while not self.stopped.wait(self.interval):
+            current = self.snapshot()
+            for rel_path, state in current.items():
+                if previous.get(rel_path) != state:
+                    self.queue.put((EVENT_CHANGED, state[0], rel_path))
+            for rel_path, state in previous.items():
+                if rel_path not in current:
+                    self.queue.put((EVENT_REMOVED, state[0], rel_path))
+            previous = current
+
+def create_watcher(directory):
+    """Returns an inotify watcher on Linux, else (or if inotify fails) a polling watcher."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass  # No inotify in this libc or out of instances
+    return PollingWatcher(directory)
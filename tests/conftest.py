@@ -0,0 +1,15 @@
+import os
+import sys
+
+# The modules of the app import each other as top level modules from src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from header_core import Author, Header, render_header
+
+def write_unparsable_header(path):
+    text = render_header(Header(team="T", website="w", description="d", year=2020,
+                                authors=[Author("50", "Jane Doe", "jane.d", ["x"])]), filename=path.name)
+    text = text.replace("//\n// Copyright", "// [50%] John Roe, no email\n//   - did stuff\n"
+                                            "//\n// Copyright")
+    path.write_text(text + "\nint x;\n", encoding="utf-8")
+    return path.read_bytes()
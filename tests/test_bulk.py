@@ -0,0 +1,10 @@
+import bulk
+from conftest import write_unparsable_header
+
+def test_edit_never_writes_headers_with_unparsed_lines(tmp_path):
+    path = tmp_path / "a.cpp"
+    before = write_unparsable_header(path)
+    filepath, status, detail = bulk.edit_file(str(path), bulk.BulkEdit(year=2025), write=True)
+    assert status == bulk.STATUS_ERROR
+    assert "unparsed lines" in detail
+    assert path.read_bytes() == before
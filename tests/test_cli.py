@@ -0,0 +1,10 @@
+import cli
+from conftest import write_unparsable_header
+
+def test_fix_never_rewrites_headers_with_unparsed_lines(tmp_path):
+    path = tmp_path / "a.cpp"
+    before = write_unparsable_header(path)
+    filepath, status, detail = cli.process_file(str(path), fix=True)
+    assert status == cli.STATUS_MISMATCH
+    assert "Malformed author line" in detail
+    assert path.read_bytes() == before
@@ -0,0 +1,30 @@
+import os
+import shutil
+import subprocess
+import pytest
+from git_changes import changed_files, parse_status
+
+def test_parse_status():
+    output = (b"M  staged.cpp\0 M tree.cpp\0?? new.cpp\0D  gone.cpp\0"
+              b"R  renamed.cpp\0old.cpp\0C  copy.cpp\0original.cpp\0MM both.cpp\0")
+    assert parse_status(output) == ["staged.cpp", "tree.cpp", "new.cpp", "renamed.cpp", "copy.cpp", "both.cpp"]
+    assert parse_status(output, staged_only=True) == ["staged.cpp", "renamed.cpp", "copy.cpp", "both.cpp"]
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_changed_files_follow_the_ignore_files(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    files = {
+        ".gitignore": "build/\n*.gen.cpp\n",
+        "src/.gitignore": "!keep.gen.cpp\n",
+        ".headercommenterignore": "third_party/\n",
+        "main.cpp": "", "main.gen.cpp": "", "src/keep.gen.cpp": "", "src/other.gen.cpp": "",
+        "build/out.cpp": "", "third_party/lib.cpp": "", "third_party/sub/lib.h": "", "notes.txt": "",
+    }
+    for rel_path, text in files.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    expected = [os.path.join(str(tmp_path), "main.cpp"), os.path.join(str(tmp_path), "src", "keep.gen.cpp")]
+    assert changed_files(str(tmp_path)) == expected
+    assert changed_files(str(tmp_path / "src")) == expected[1:]
@@ -0,0 +1,52 @@
+from header_core import Author, Header, parse_header, render_header, wrap_description
+
+LONG_PARAGRAPH = " ".join(["engine render physics audio input entity component system"] * 4)
+
+def make_header(description):
+    return Header(team="Team", website="team.com", description=description, year=2024,
+                  authors=[Author("60", "Jane Doe", "jane.doe", ["Renderer", "Tools"]),
+                           Author("40", "John Roe", "john.roe")])
+
+def test_wrapped_lines_have_no_trailing_spaces():
+    lines = wrap_description(LONG_PARAGRAPH + "\n\n  indented " + LONG_PARAGRAPH)
+    assert len(lines) > 4
+    assert all(line == line.rstrip() for line in lines)
+    assert all(len(line) <= 80 for line in lines)
+
+def test_render_parse_render_round_trip():
+    for description in ["", "One line.", LONG_PARAGRAPH, LONG_PARAGRAPH + "\n\n" + LONG_PARAGRAPH,
+                        "  indented " + LONG_PARAGRAPH]:
+        rendered = render_header(make_header(description), filename="file.cpp")
+        parsed = parse_header(rendered)
+        assert parsed.errors == []
+        assert render_header(parsed, filename="file.cpp") == rendered
+
+def test_parse_keeps_fields():
+    parsed = parse_header(render_header(make_header("Short."), filename="file.cpp"))
+    assert (parsed.team, parsed.website, parsed.filename, parsed.year) == ("Team", "team.com", "file.cpp", 2024)
+    assert parsed.description == "Short."
+    assert [author.name for author in parsed.authors] == ["Jane Doe", "John Roe"]
+    assert parsed.authors[0].points == ["Renderer", "Tools"]
+
+def parse_authors(*author_lines):
+    header = render_header(make_header(""), filename="file.cpp")
+    header = header.replace("// AUTHORS\n", "// AUTHORS\n" + "".join(f"// {line}\n" for line in author_lines), 1)
+    return parse_header(header)
+
+def test_parse_ignores_text_after_the_email():
+    parsed = parse_authors(r"[50%] Ann Lee (ann.l\@digipen.edu) - lead", "  - Gameplay")
+    assert parsed.errors == []
+    assert parsed.authors[0] == Author("50", "Ann Lee", "ann.l", ["Gameplay"])
+
+def test_parse_author_variants():
+    parsed = parse_authors(r"[50] Ann Lee (ann.l\@digipen.edu)",
+                           r"[ 25 % ] Ann (AJ) Lee (ann.j\@digipen.edu) (lead)",
+                           "[25%] Bo (B) Ng (bo.ng)")
+    assert parsed.errors == []
+    assert [(author.percent, author.name, author.email) for author in parsed.authors[:3]] == [
+        ("50", "Ann Lee", "ann.l"), ("25", "Ann (AJ) Lee", "ann.j"), ("25", "Bo (B) Ng", "bo.ng")]
+
+def test_parse_reports_malformed_author_lines():
+    parsed = parse_authors("[50%] Ann Lee", "  - Gameplay", "[50%] Bo Ng (bo.ng) - lead")
+    assert [error.line for error in parsed.errors] == [7, 8, 9]
+    assert [author.name for author in parsed.authors] == ["Jane Doe", "John Roe"]
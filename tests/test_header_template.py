@@ -0,0 +1,32 @@
+from header_core import Author, Header
+from header_template import DEFAULT_FORMAT, HeaderTemplate
+
+HEADER = ("// Team [team.com]\n// file.cpp\n//\n// Text\n//\n// AUTHORS\n"
+          "// [100%] A (B) (c\\@digipen.edu)\n//\n// Copyright (c) 2024 DigiPen, All rights reserved.")
+
+def test_builtin_format_round_trip():
+    parsed = DEFAULT_FORMAT.parse(HEADER.replace("[100%]", "[100]"))
+    assert parsed.errors == []
+    assert [(author.percent, author.name, author.email) for author in parsed.authors] == [("100", "A (B)", "c")]
+    assert DEFAULT_FORMAT.render(parsed) == HEADER
+
+def test_name_with_parentheses_keeps_last_group_as_email():
+    template = HeaderTemplate("// {team} [{website}]\n// {filename}\n//\n// {description}\n//\n// AUTHORS\n"
+                              "// [{percent}%] {name} ({email}\\@digipen.edu)\n//   - {point}\n//\n"
+                              "// Copyright (c) {year} DigiPen, All rights reserved.\n")
+    parsed = template.parse(HEADER)
+    assert parsed.errors == []
+    assert [(author.name, author.email) for author in parsed.authors] == [("A (B)", "c")]
+    assert template.render(parsed) == HEADER
+
+def test_custom_template_round_trip():
+    template = HeaderTemplate("// {team} <{website}>\n// {description}\n// {name} <{email}> {percent}%\n"
+                              "// (c) {year}\n")
+    header = Header(team="Team", website="team.com", description="Text", year=2024,
+                    authors=[Author("100", "Jane <J> Doe", "jane@team.com")])
+    rendered = template.render(header, filename="file.cpp")
+    parsed = template.parse(rendered)
+    assert parsed.errors == []
+    assert [(author.name, author.email, author.percent) for author in parsed.authors] == \
+        [("Jane <J> Doe", "jane@team.com", "100")]
+    assert template.render(parsed, filename="file.cpp") == rendered
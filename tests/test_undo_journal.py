@@ -0,0 +1,63 @@
+import time
+from header_core import Author, Header, read_header, render_header, write_header
+from undo_journal import STALE_BATCH_SECONDS, STATUS_CONFLICT, STATUS_REVERTED, JournalBatch, UndoJournal
+
+def make_header(team):
+    return render_header(Header(team=team, website="team.com", description="Text.", year=2024,
+                                authors=[Author("100", "Jane Doe", "jane.doe")]), filename="a.cpp")
+
+def save(journal, path, header, label="Save"):
+    old = write_header(str(path), header)
+    journal.record(label, str(path), old, header)
+
+def test_trim_keeps_unfinished_and_newest_batches(tmp_path):
+    journal = UndoJournal(str(tmp_path / "journal.log"))
+    finished = journal.start_batch("Finished")
+    for i in range(20):
+        finished.record(str(tmp_path / f"{i}.cpp"), "", make_header(f"Team {i}"))
+    journal.finish_batch(finished)
+    stale = JournalBatch(journal.path, (int(time.time()) - 2 * STALE_BATCH_SECONDS) * 10**6, "Crashed")
+    stale.record(str(tmp_path / "stale.cpp"), "", make_header("Stale"))
+    unfinished = journal.start_batch("Unfinished")
+    unfinished.record(str(tmp_path / "open.cpp"), "", make_header("Open"))
+    journal.record("Newest", str(tmp_path / "new.cpp"), "", make_header("New"))
+
+    journal.max_bytes = 1  # Everything that may go goes
+    journal.trim()
+    assert [info.label for info in journal.batches()] == ["Newest", "Unfinished"]
+    assert [entry.filepath for entry in journal.entries(unfinished.batch)] == [str(tmp_path / "open.cpp")]
+
+    journal.finish_batch(unfinished)
+    assert [info.label for info in journal.batches()] == ["Newest"]
+
+def test_rollback_reports_conflicts(tmp_path):
+    journal = UndoJournal(str(tmp_path / "journal.log"))
+    path = tmp_path / "a.cpp"
+    path.write_text(make_header("A") + "\nint x;\n")
+    save(journal, path, make_header("B"))
+    write_header(str(path), make_header("C"))  # Changed by someone else since
+    before = path.read_bytes()
+
+    batch = journal.batches()[0].batch
+    results = list(journal.rollback(journal.entries(batch)))
+    assert [status for _, status, _ in results] == [STATUS_CONFLICT]
+    assert path.read_bytes() == before
+
+def test_rollback_of_a_rollback(tmp_path):
+    journal = UndoJournal(str(tmp_path / "journal.log"))
+    path = tmp_path / "a.cpp"
+    path.write_text("int x;\n")
+    save(journal, path, make_header("A"))
+    save(journal, path, make_header("B"))
+
+    # Newest first: rolling back both saves leaves the file without a header
+    entries = [entry for info in reversed(journal.batches()) for entry in journal.entries(info.batch)]
+    results = list(journal.rollback(entries))
+    assert [status for _, status, _ in results] == [STATUS_REVERTED, STATUS_REVERTED]
+    assert path.read_text() == "int x;\n"
+
+    rollback = journal.batches()[0]
+    assert (rollback.label, rollback.count) == ("Rollback", 2)
+    results = list(journal.rollback(journal.entries(rollback.batch)))
+    assert [status for _, status, _ in results] == [STATUS_REVERTED, STATUS_REVERTED]
+    assert read_header(str(path)).text == make_header("B")
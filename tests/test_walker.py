@@ -0,0 +1,62 @@
+import os
+import shutil
+import subprocess
+import pytest
+from header_core import CPP_EXTENSIONS
+from walker import iter_cpp_files
+
+GITIGNORE = """\
+# Comment
+*.gen.cpp
+!keep.gen.cpp
+build/
+/root_only.cpp
+**/deep/*.h
+docs/*.cpp
+[ab].hpp
+?.inl
+\\#hash.c
+\\!bang.c
+space.c\\ 
+trailing.c   
+generated/**
+vendor/*
+!vendor/ours/
+"""
+
+NESTED_GITIGNORE = """\
+!*.gen.cpp
+*.h
+/local.cpp
+sub/**/x.c
+"""
+
+FILES = [
+    "main.cpp", "main.gen.cpp", "keep.gen.cpp", "root_only.cpp", "trailing.c", "space.c ", "#hash.c", "!bang.c",
+    "a.hpp", "b.hpp", "c.hpp", "ab.hpp", "x.inl", "xy.inl",
+    "build/out.cpp", "src/build/out.cpp", "src/root_only.cpp", "src/deep/a.h", "src/deep/a.hpp",
+    "deep/b.h", "a/b/deep/c.h", "docs/x.cpp", "docs/api/y.cpp", "src/docs/z.cpp",
+    "generated/a.cpp", "generated/sub/b.cpp", "vendor/lib.cpp", "vendor/theirs/lib.cpp", "vendor/ours/lib.cpp",
+    "lib/other.gen.cpp", "lib/local.cpp", "lib/x/local.cpp", "lib/util.h", "lib/util.hpp",
+    "lib/sub/x.c", "lib/sub/a/b/x.c", "lib/x.c",
+]
+
+def git_untracked(directory):
+    output = subprocess.run(["git", "-C", directory, "ls-files", "-o", "--exclude-standard", "-z"],
+                            capture_output=True, check=True).stdout
+    return {os.fsdecode(path) for path in output.split(b"\0")
+            if os.path.splitext(os.fsdecode(path))[1].lower() in CPP_EXTENSIONS}
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_ignore_rules_match_git(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    for rel_path in FILES:
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (tmp_path / ".gitignore").write_text(GITIGNORE)
+    (tmp_path / "lib").mkdir(exist_ok=True)
+    (tmp_path / "lib" / ".gitignore").write_text(NESTED_GITIGNORE)
+
+    walked = {rel_path.replace(os.sep, "/") for _, rel_path in iter_cpp_files(str(tmp_path))}
+    assert walked == git_untracked(str(tmp_path))
@@ -0,0 +1,67 @@
+import os
+import stat
+import pytest
+from header_core import UTF8_BOM, Author, Header, read_header, remove_header, render_header, write_header
+
+OLD = render_header(Header(team="Old", website="old.com", description="Old.", year=2020,
+                           authors=[Author("100", "Jane Doe", "jane.doe")]), filename="a.cpp")
+NEW = render_header(Header(team="New", website="new.com", description="New.", year=2024,
+                           authors=[Author("100", "John Roe", "john.roe", ["Tools"])]), filename="a.cpp")
+# Mixed line endings, bytes that are not UTF-8 and no final line break
+BODY = b"\r\n#include <a>\nint x;\r\n\xff\xfe // Copyright (c) 1999\r\n\r\n  tail"
+
+def test_body_is_copied_byte_for_byte(tmp_path):
+    path = tmp_path / "a.cpp"
+    path.write_bytes(UTF8_BOM + OLD.replace("\n", "\r\n").encode() + BODY)
+    assert write_header(str(path), NEW) == OLD
+    assert path.read_bytes() == UTF8_BOM + NEW.replace("\n", "\r\n").encode() + BODY
+    assert read_header(str(path)).text == NEW
+
+def test_insert_then_remove_round_trip(tmp_path):
+    for before in [b"int x;\n", UTF8_BOM + b"int x;\r\nint y;\r\n", b""]:
+        path = tmp_path / "a.cpp"
+        path.write_bytes(before)
+        assert write_header(str(path), NEW) == ""
+        assert read_header(str(path)).text == NEW
+        assert remove_header(str(path)) == NEW
+        assert path.read_bytes() == before
+        assert remove_header(str(path)) == ""
+
+def test_symbolic_link_target_is_written(tmp_path):
+    target = tmp_path / "a.cpp"
+    target.write_bytes(OLD.encode() + b"\nint x;\n")
+    link = tmp_path / "link.cpp"
+    try:
+        link.symlink_to(target)
+    except (OSError, NotImplementedError):
+        pytest.skip("symbolic links are not available")
+    write_header(str(link), NEW)
+    assert link.is_symlink()
+    assert target.read_bytes() == NEW.encode() + b"\nint x;\n"
+
+def test_hard_links_all_see_the_new_header(tmp_path):
+    path = tmp_path / "a.cpp"
+    path.write_bytes(OLD.encode() + b"\nint x;\n")
+    other = tmp_path / "b.cpp"
+    try:
+        os.link(path, other)
+    except (OSError, NotImplementedError):
+        pytest.skip("hard links are not available")
+    write_header(str(path), NEW)
+    assert os.path.samefile(path, other)
+    assert other.read_bytes() == NEW.encode() + b"\nint x;\n"
+
+def test_read_only_file_raises(tmp_path, monkeypatch):
+    path = tmp_path / "a.cpp"
+    path.write_bytes(OLD.encode() + b"\nint x;\n")
+    path.chmod(stat.S_IREAD)
+    if hasattr(os, "geteuid") and os.geteuid() == 0:
+        monkeypatch.setattr(os, "access", lambda path, mode: False)  # Root may write anything
+    try:
+        with pytest.raises(PermissionError):
+            write_header(str(path), NEW)
+        with pytest.raises(PermissionError):
+            remove_header(str(path))
+        assert path.read_bytes() == OLD.encode() + b"\nint x;\n"
+    finally:
+        path.chmod(stat.S_IREAD | stat.S_IWRITE)